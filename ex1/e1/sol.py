@@ -1,19 +1,79 @@
 # solution_q1.py
+import sys
+from bisect import bisect_right, insort
+from collections import OrderedDict
+
+# Below this many factors a plain loop is faster than splitting further
+PRODUCT_LEAF_SIZE = 32
+# Maximum number of factorials kept around for reuse by later queries
+CACHE_SIZE = 64
+
+# Previously computed factorials: n -> n!, ordered from least to most recently used
+_factorial_cache = OrderedDict()
+# Sorted copy of the cache keys, so we can find the nearest checkpoint quickly
+_cached_ns = []
+
+def _product_range(lo, hi):
+    """Multiplies all integers in [lo, hi] using binary splitting."""
+    if lo > hi:
+        return 1
+    if hi - lo < PRODUCT_LEAF_SIZE:
+        result = lo
+        for i in range(lo + 1, hi + 1):
+            result *= i
+        return result
+
+    # Split the range in half so both operands of the final multiply
+    # have a similar size, which is where big-integer multiplication shines
+    mid = (lo + hi) // 2
+    return _product_range(lo, mid) * _product_range(mid + 1, hi)
+
+def _remember(n, value):
+    """Stores n! in the cache, evicting the least recently used entry if full."""
+    if n not in _factorial_cache:
+        insort(_cached_ns, n)
+    _factorial_cache[n] = value
+    _factorial_cache.move_to_end(n)
+
+    while len(_factorial_cache) > CACHE_SIZE:
+        old_n, _ = _factorial_cache.popitem(last=False)
+        del _cached_ns[bisect_right(_cached_ns, old_n) - 1]
 
 def factorial(n):
     """Calculates the factorial of a non-negative integer."""
-    if n == 0:
+    if n <= 1:
         return 1
-    
-    result = 1
-    for i in range(1, n + 1):
-        result *= i
+
+    if n in _factorial_cache:
+        _factorial_cache.move_to_end(n)
+        return _factorial_cache[n]
+
+    # Start from the largest cached checkpoint below n and only
+    # multiply in the factors that are still missing
+    idx = bisect_right(_cached_ns, n) - 1
+    if idx >= 0:
+        checkpoint = _cached_ns[idx]
+        result = _factorial_cache[checkpoint] * _product_range(checkpoint + 1, n)
+    else:
+        result = _product_range(2, n)
+
+    _remember(n, result)
     return result
 
 # Main script execution
 if __name__ == "__main__":
-    try:
-        num = int(input())
-        print(factorial(num))
-    except (ValueError, IndexError):
-        print("Invalid input. Please enter a single non-negative integer.")
\ No newline at end of file
+    # Very large factorials have more digits than Python prints by default
+    if hasattr(sys, "set_int_max_str_digits"):
+        sys.set_int_max_str_digits(0)
+
+    # Every whitespace-separated value on stdin is a separate query
+    tokens = sys.stdin.read().split()
+    if not tokens:
+        print("Invalid input. Please enter a single non-negative integer.")
+
+    for token in tokens:
+        try:
+            num = int(token)
+            print(factorial(num))
+        except (ValueError, IndexError):
+            print("Invalid input. Please enter a single non-negative integer.")
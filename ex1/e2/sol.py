@@ -1,18 +1,135 @@
 # solution_q2.py
+import io
+import sys
+import time
+
+# Roughly how many bytes of input are parsed per batch chunk
+CHUNK_BYTES = 1 << 22
 
 def calculate_kinetic_energy(mass, velocity):
     """Calculates kinetic energy using the formula KE = 0.5 * m * v^2."""
     return 0.5 * mass * (velocity ** 2)
 
+def _parse_chunk(text, np):
+    """Turns a block of 'mass velocity' (or 'mass,velocity') lines into two arrays."""
+    if "," in text:
+        text = text.replace(",", " ")
+    if not text.strip():
+        return np.empty(0), np.empty(0)
+    # loadtxt parses line by line in C, so a line with a missing or extra
+    # field is an error instead of shifting every later pair
+    pairs = np.loadtxt(io.StringIO(text), ndmin=2)
+    if pairs.shape[1] != 2:
+        raise ValueError("Every line must contain both a mass and a velocity.")
+    return pairs[:, 0], pairs[:, 1]
+
+def _read_text_chunks(infile, chunk_bytes):
+    """Yields blocks of complete lines, each roughly chunk_bytes long."""
+    leftover = ""
+    while True:
+        block = infile.read(chunk_bytes)
+        if not block:
+            break
+        block = leftover + block
+        # Hold back a trailing partial line until the next read completes it
+        cut = block.rfind("\n") + 1
+        leftover = block[cut:]
+        if cut:
+            yield block[:cut]
+    if leftover:
+        yield leftover
+
+def iter_kinetic_energy_chunks(infile, chunk_bytes=CHUNK_BYTES):
+    """
+    Reads (mass, velocity) pairs from a text stream in chunks and yields
+    one NumPy array of kinetic energies per chunk, so memory stays bounded
+    no matter how large the input is.
+    """
+    import numpy as np
+
+    first_chunk = True
+    for text in _read_text_chunks(infile, chunk_bytes):
+        # Skip a CSV header such as "mass,velocity" on the very first line
+        if first_chunk:
+            first_chunk = False
+            first_line, _, rest = text.partition("\n")
+            try:
+                [float(x) for x in first_line.replace(",", " ").split()]
+            except ValueError:
+                text = rest
+
+        masses, velocities = _parse_chunk(text, np)
+        yield calculate_kinetic_energy(masses, velocities)
+
+def run_batch(infile, outfile, chunk_bytes=CHUNK_BYTES):
+    """Computes KE for every line of infile and writes one result per line."""
+    count = 0
+    for energies in iter_kinetic_energy_chunks(infile, chunk_bytes):
+        if energies.size:
+            # tolist() gives plain floats, so each value is formatted like print(ke)
+            outfile.write("\n".join(map(repr, energies.tolist())))
+            outfile.write("\n")
+        count += energies.size
+    return count
+
+def benchmark(num_pairs=1_000_000):
+    """Compares the chunked batch mode against calling the function per line."""
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    pairs = rng.uniform(0.1, 1000.0, size=(num_pairs, 2))
+    text = "\n".join(f"{m} {v}" for m, v in pairs.tolist()) + "\n"
+
+    start = time.perf_counter()
+    per_line_out = io.StringIO()
+    for line in io.StringIO(text):
+        parts = line.split()
+        per_line_out.write(repr(calculate_kinetic_energy(float(parts[0]), float(parts[1]))))
+        per_line_out.write("\n")
+    per_line_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch_out = io.StringIO()
+    run_batch(io.StringIO(text), batch_out)
+    batch_time = time.perf_counter() - start
+
+    # NumPy squares with v*v while a Python float goes through pow(),
+    # so the two paths may disagree in the very last bit
+    per_line_values = np.array(per_line_out.getvalue().split(), dtype=float)
+    batch_values = np.array(batch_out.getvalue().split(), dtype=float)
+    if not np.allclose(per_line_values, batch_values, rtol=1e-15, atol=0):
+        print("Warning: batch output differs from per-line output!")
+
+    print(f"Pairs: {num_pairs}")
+    print(f"Per-line: {per_line_time:.3f} s ({num_pairs / per_line_time:,.0f} pairs/s)")
+    print(f"Batch:    {batch_time:.3f} s ({num_pairs / batch_time:,.0f} pairs/s)")
+    print(f"Speedup:  {per_line_time / batch_time:.1f}x")
+
 # Main script execution
 if __name__ == "__main__":
-    try:
-        # Read the line and split it into two parts
-        parts = input().split()
-        m = float(parts[0])
-        v = float(parts[1])
-        
-        ke = calculate_kinetic_energy(m, v)
-        print(ke)
-    except (ValueError, IndexError):
-        print("Invalid input. Please enter mass and velocity separated by a space.")
\ No newline at end of file
+    # Usage:
+    #   python sol.py                  -> one "mass velocity" line (judge mode)
+    #   python sol.py --batch [file]   -> many lines from stdin or a CSV file
+    #   python sol.py --bench [count]  -> per-line vs batch benchmark
+    if len(sys.argv) > 1 and sys.argv[1] == "--bench":
+        benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000)
+    elif len(sys.argv) > 1 and sys.argv[1] == "--batch":
+        try:
+            if len(sys.argv) > 2:
+                with open(sys.argv[2], 'r') as f:
+                    run_batch(f, sys.stdout)
+            else:
+                run_batch(sys.stdin, sys.stdout)
+        except ValueError:
+            print("Invalid input. Every line must contain mass and velocity.")
+    else:
+        try:
+            # Read the line and split it into two parts
+            parts = input().split()
+            m = float(parts[0])
+            v = float(parts[1])
+
+            ke = calculate_kinetic_energy(m, v)
+            print(ke)
+        except (ValueError, IndexError):
+            print("Invalid input. Please enter mass and velocity separated by a space.")
@@ -1,32 +1,118 @@
-def to_binary(n):
-    """Converts a decimal integer to its binary string representation."""
+import sys
+
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+# Bases whose conversion Python can already do in linear time with format()
+_FORMAT_SPECS = {2: "b", 8: "o", 16: "X"}
+
+# Numbers longer than this many bits are split with divide-and-conquer
+DC_THRESHOLD_BITS = 8192
+
+# base -> list of (base ** width, width) with width doubling at every level
+_power_cache = {}
+
+def _chunk_info(base):
+    """Largest power of base that still fits in a single 30-bit machine digit."""
+    width = 1
+    while base ** (width + 1) < 2 ** 30:
+        width += 1
+    return base ** width, width
+
+def _digits_of(n, base):
+    """Digits of a small non-negative int, most significant first."""
+    digits = []
+    while n:
+        n, r = divmod(n, base)
+        digits.append(DIGITS[r])
+    digits.reverse()
+    return "".join(digits)
+
+def _to_base_small(n, base):
+    """Converts n > 0 by peeling off one machine-word chunk of digits at a time."""
+    chunk_value, width = _chunk_info(base)
+    parts = []
+    while n >= chunk_value:
+        n, r = divmod(n, chunk_value)
+        parts.append(_digits_of(r, base).rjust(width, "0"))
+    parts.append(_digits_of(n, base))
+    parts.reverse()
+    return "".join(parts)
+
+def _powers_for(base, n):
+    """Returns the cached powers base**(w*2**i), extended until the last one squared exceeds n."""
+    powers = _power_cache.get(base)
+    if powers is None:
+        powers = _power_cache[base] = [_chunk_info(base)]
+    while powers[-1][0] ** 2 <= n:
+        power, width = powers[-1]
+        powers.append((power * power, width * 2))
+    return powers
+
+def _to_base_large(n, base, powers, level, pad, out):
+    """Appends the digits of n to out, left-padded with zeros to pad digits."""
+    if level < 0 or n.bit_length() <= DC_THRESHOLD_BITS:
+        out.append((_to_base_small(n, base) if n else "").rjust(pad, "0"))
+        return
+
+    power, width = powers[level]
+    if n < power:
+        _to_base_large(n, base, powers, level - 1, pad, out)
+        return
+
+    # n = high * base**width + low, where low fills exactly width digits
+    high, low = divmod(n, power)
+    _to_base_large(high, base, powers, level - 1, max(pad - width, 0), out)
+    _to_base_large(low, base, powers, level - 1, width, out)
+
+def to_base(n, base):
+    """Converts an integer to its string representation in any base from 2 to 36."""
+    if not 2 <= base <= 36:
+        raise ValueError("base must be between 2 and 36")
     if n == 0:
         return "0"
+    if n < 0:
+        return "-" + to_base(-n, base)
+
+    if base in _FORMAT_SPECS:
+        return format(n, _FORMAT_SPECS[base])
+    if n.bit_length() <= DC_THRESHOLD_BITS:
+        return _to_base_small(n, base)
 
-    binary_str = ""
-    while n > 0:
-        binary_str = str(n % 2) + binary_str
-        n //= 2
-    return binary_str
+    powers = _powers_for(base, n)
+    out = []
+    _to_base_large(n, base, powers, len(powers) - 1, 0, out)
+    return "".join(out)
+
+def convert_many(numbers, bases=(2, 16)):
+    """Converts every number to each of the given bases, yielding one tuple per number."""
+    for n in numbers:
+        yield tuple(to_base(n, base) for base in bases)
+
+def to_binary(n):
+    """Converts a decimal integer to its binary string representation."""
+    return to_base(n, 2)
 
 def to_hexadecimal(n):
     """Converts a decimal integer to its hexadecimal string representation."""
-    if n == 0:
-        return "0"
-
-    hex_chars = "0123456789ABCDEF"
-    hex_str = ""
-    while n > 0:
-        remainder = n % 16
-        hex_str = hex_chars[remainder] + hex_str
-        n //= 16
-    return hex_str
+    return to_base(n, 16)
 
 # Main script execution
 if __name__ == "__main__":
-    try:
-        num = int(input())
-        print(to_binary(num))
-        print(to_hexadecimal(num))
-    except (ValueError, IndexError):
-        print("Invalid input. Please enter a single non-negative integer.")
\ No newline at end of file
+    # Allow huge decimal inputs (Python limits int/str conversions by default)
+    if hasattr(sys, "set_int_max_str_digits"):
+        sys.set_int_max_str_digits(0)
+
+    # Every whitespace-separated value on stdin is converted in turn
+    tokens = sys.stdin.read().split()
+    if not tokens:
+        print("Invalid input. Please enter a single non-negative integer.")
+
+    for token in tokens:
+        try:
+            num = int(token)
+            if num < 0:
+                raise ValueError(token)
+            print(to_binary(num))
+            print(to_hexadecimal(num))
+        except (ValueError, IndexError):
+            print("Invalid input. Please enter a single non-negative integer.")
@@ -1,21 +1,119 @@
 # solution_q4.py
+import argparse
+import sys
+import time
+from multiprocessing import Pool
+
+# Offsets inside one 15-number cycle that are printed as plain numbers
+_NUMBER_OFFSETS = (1, 2, 4, 7, 8, 11, 13, 14)
+# One pre-rendered cycle; the %d slots are filled with the numbers above
+_CYCLE_TEMPLATE = "%d %d Fizz %d Buzz Fizz %d %d Fizz Buzz %d Fizz %d %d FizzBuzz"
+
+# How many 15-number cycles are rendered per block of output
+BLOCK_CYCLES = 4096
+# How many numbers each worker process renders per task in parallel mode
+SEGMENT_SIZE = 15 * BLOCK_CYCLES * 16
+
+def fizzbuzz_word(i):
+    """Returns the FizzBuzz word for a single number."""
+    return ('FizzBuzz' if i % 15 == 0
+            else 'Fizz' if i % 3 == 0
+            else 'Buzz' if i % 5 == 0
+            else str(i))
+
+def iter_fizzbuzz_blocks(start, stop, block_cycles=BLOCK_CYCLES):
+    """
+    Yields the FizzBuzz words for start..stop (inclusive) as space-separated
+    text blocks. Whole 15-number cycles are rendered from a template, so
+    only the unaligned head and tail are handled number by number.
+    """
+    if start > stop:
+        return
+
+    # Unaligned head: up to the next multiple of 15
+    head_end = min(stop, ((start - 1) // 15 + 1) * 15)
+    if start <= head_end and (start - 1) % 15:
+        yield " ".join(fizzbuzz_word(i) for i in range(start, head_end + 1))
+        start = head_end + 1
+
+    # Full cycles, block_cycles at a time
+    block_template = " ".join([_CYCLE_TEMPLATE] * block_cycles)
+    full_cycles_end = stop - stop % 15
+    while start + 15 * block_cycles - 1 <= full_cycles_end:
+        yield block_template % tuple(
+            base + offset
+            for base in range(start - 1, start - 1 + 15 * block_cycles, 15)
+            for offset in _NUMBER_OFFSETS
+        )
+        start += 15 * block_cycles
+
+    # Remaining full cycles that don't fill a whole block
+    cycles_left = (full_cycles_end - start + 1) // 15
+    if cycles_left > 0:
+        yield " ".join([_CYCLE_TEMPLATE] * cycles_left) % tuple(
+            base + offset
+            for base in range(start - 1, full_cycles_end, 15)
+            for offset in _NUMBER_OFFSETS
+        )
+        start = full_cycles_end + 1
+
+    # Unaligned tail
+    if start <= stop:
+        yield " ".join(fizzbuzz_word(i) for i in range(start, stop + 1))
+
+def _render_segment(bounds):
+    """Worker task: renders one segment of the sequence to bytes."""
+    start, stop = bounds
+    return " ".join(iter_fizzbuzz_blocks(start, stop)).encode("ascii")
+
+def write_fizzbuzz(n, out, workers=1):
+    """
+    Writes the FizzBuzz sequence for 1..n to the binary stream out, followed
+    by a newline, and returns the number of bytes written. Memory stays flat
+    because only one block (or a few worker segments) exists at a time.
+    """
+    written = 0
+    separator = b""
+
+    if workers > 1 and n > SEGMENT_SIZE:
+        segments = [(lo, min(lo + SEGMENT_SIZE - 1, n)) for lo in range(1, n + 1, SEGMENT_SIZE)]
+        with Pool(workers) as pool:
+            # imap keeps the segments in order as they are concatenated
+            for chunk in pool.imap(_render_segment, segments):
+                out.write(separator)
+                out.write(chunk)
+                written += len(separator) + len(chunk)
+                separator = b" "
+    else:
+        for block in iter_fizzbuzz_blocks(1, n):
+            chunk = block.encode("ascii")
+            out.write(separator)
+            out.write(chunk)
+            written += len(separator) + len(chunk)
+            separator = b" "
+
+    out.write(b"\n")
+    return written + 1
 
 # Main script execution
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Streams the FizzBuzz sequence for 1..N (N is read from stdin).")
+    parser.add_argument("--workers", type=int, default=1, help="number of worker processes")
+    parser.add_argument("--stats", action="store_true", help="report throughput on stderr")
+    options = parser.parse_args()
+
     try:
         n = int(input())
-        
-        # Use a list comprehension with nested conditional (ternary) operators
-        fizzbuzz_list = [
-            'FizzBuzz' if i % 15 == 0 
-            else 'Fizz' if i % 3 == 0 
-            else 'Buzz' if i % 5 == 0 
-            else str(i) 
-            for i in range(1, n + 1)
-        ]
-        
-        # Join the list elements with a space for the final output
-        print(" ".join(fizzbuzz_list))
-        
+
+        start = time.perf_counter()
+        num_bytes = write_fizzbuzz(n, sys.stdout.buffer, workers=options.workers)
+        sys.stdout.flush()
+        elapsed = time.perf_counter() - start
+
+        if options.stats:
+            megabytes = num_bytes / 1e6
+            print(f"Wrote {megabytes:.1f} MB in {elapsed:.3f} s "
+                  f"({megabytes / max(elapsed, 1e-9):.1f} MB/s)", file=sys.stderr)
+
     except (ValueError, IndexError):
-        print("Invalid input. Please enter a single positive integer.")
\ No newline at end of file
+        print("Invalid input. Please enter a single positive integer.")
@@ -1,34 +1,341 @@
 # solution_q5.py
+import json
+import os
+import random
+import sys
+import time
+from array import array
 from collections import deque
 
+def _build_path(parents, node):
+    """Follows parent pointers back from node and returns the path in forward order."""
+    path = []
+    while node is not None:
+        path.append(node)
+        node = parents[node]
+    path.reverse()
+    return path
+
 def find_path(graph, start, end):
     """Finds a path between start and end stations using Breadth-First Search (BFS)."""
     if start not in graph or end not in graph:
         return None # One of the stations doesn't exist
+    if start == end:
+        return [start]
+
+    # Instead of storing a whole path per queue entry, remember only where
+    # each station was reached from and rebuild the path once at the end
+    parents = {start: None}
+    queue = deque([start])
+
+    while queue:
+        current_station = queue.popleft()
+
+        for neighbor in graph.get(current_station, []):
+            if neighbor not in parents:
+                parents[neighbor] = current_station
+                if neighbor == end:
+                    return _build_path(parents, end) # Path found
+                queue.append(neighbor)
+
+    return None # No path found
+
+def find_path_bidirectional(graph, start, end):
+    """
+    Finds a shortest path by searching from both ends at once and stopping
+    when the two searches meet. Connections are assumed to be two-way, as in
+    the metro map. The result has the same length as find_path's and is the
+    same path whenever the shortest route is unique.
+    """
+    if start not in graph or end not in graph:
+        return None
+    if start == end:
+        return [start]
+
+    forward_parents = {start: None}
+    backward_parents = {end: None}
+    forward_frontier = [start]
+    backward_frontier = [end]
+
+    while forward_frontier and backward_frontier:
+        # Always grow the smaller frontier by one full level
+        expand_forward = len(forward_frontier) <= len(backward_frontier)
+        if expand_forward:
+            frontier, parents, other_parents = forward_frontier, forward_parents, backward_parents
+        else:
+            frontier, parents, other_parents = backward_frontier, backward_parents, forward_parents
+
+        next_frontier = []
+        for station in frontier:
+            for neighbor in graph.get(station, []):
+                if neighbor in parents:
+                    continue
+                parents[neighbor] = station
+                if neighbor in other_parents:
+                    # The searches met: join the two halves at this station
+                    first_half = _build_path(forward_parents, neighbor)
+                    second_half = _build_path(backward_parents, neighbor)
+                    second_half.reverse()
+                    return first_half + second_half[1:]
+                next_frontier.append(neighbor)
+
+        if expand_forward:
+            forward_frontier = next_frontier
+        else:
+            backward_frontier = next_frontier
+
+    return None
+
+# --- Precomputed route index for many queries ---
+
+class RouteIndex:
+    """
+    A metro map stored as integer-indexed CSR arrays (offsets + neighbors)
+    together with one BFS parent tree per station. After the one-off
+    preprocessing a route is read straight off the tree, so each query only
+    costs as much as the length of the route it returns.
+    """
+
+    MAGIC = b"METROIDX1\n"
+
+    def __init__(self, names, offsets, neighbors, parents=None):
+        self.names = names
+        self.ids = {name: i for i, name in enumerate(names)}
+        self.offsets = offsets      # neighbors of i are neighbors[offsets[i]:offsets[i + 1]]
+        self.neighbors = neighbors
+        # parents[s * V + v] is the station before v on the route from s, or -1
+        self.parents = parents if parents is not None else self._build_parents()
+
+    @classmethod
+    def from_graph(cls, graph):
+        """Builds the index from an adjacency-list dict such as metro_graph."""
+        names = list(graph)
+        ids = {name: i for i, name in enumerate(names)}
+        # Stations that only appear as someone's neighbor still get an id
+        for neighbor_list in graph.values():
+            for neighbor in neighbor_list:
+                if neighbor not in ids:
+                    ids[neighbor] = len(names)
+                    names.append(neighbor)
+
+        offsets = array('i', [0])
+        neighbors = array('i')
+        for name in names:
+            neighbors.extend(ids[n] for n in graph.get(name, []))
+            offsets.append(len(neighbors))
+        return cls(names, offsets, neighbors)
+
+    @classmethod
+    def from_map_file(cls, filepath):
+        """
+        Loads a metro map from a JSON adjacency list (.json) or from a text
+        file where each line lists the consecutive stations of one metro line
+        (two stations on a line is a single two-way connection).
+        """
+        if filepath.endswith(".json"):
+            with open(filepath, 'r') as f:
+                return cls.from_graph(json.load(f))
+
+        graph = {}
+        with open(filepath, 'r') as f:
+            for line in f:
+                stations = line.split("#", 1)[0].split()
+                for station in stations:
+                    graph.setdefault(station, [])
+                for a, b in zip(stations, stations[1:]):
+                    graph[a].append(b)
+                    graph[b].append(a)
+        return cls.from_graph(graph)
+
+    def _build_parents(self):
+        """Runs one BFS per station over the CSR arrays."""
+        num_stations = len(self.names)
+        offsets, neighbors = self.offsets, self.neighbors
+        parents = array('i', [-1]) * (num_stations * num_stations)
+
+        for source in range(num_stations):
+            base = source * num_stations
+            parents[base + source] = source
+            queue = deque([source])
+            while queue:
+                station = queue.popleft()
+                for k in range(offsets[station], offsets[station + 1]):
+                    neighbor = neighbors[k]
+                    if parents[base + neighbor] == -1:
+                        parents[base + neighbor] = station
+                        queue.append(neighbor)
+        return parents
+
+    def find_path(self, start, end):
+        """Same result as find_path(graph, start, end), read from the precomputed trees."""
+        if start not in self.ids or end not in self.ids:
+            return None
+        source, target = self.ids[start], self.ids[end]
+        base = source * len(self.names)
+        if self.parents[base + target] == -1:
+            return None
 
-    # The queue will store paths (lists of stations)
+        path = [target]
+        while target != source:
+            target = self.parents[base + target]
+            path.append(target)
+        path.reverse()
+        return [self.names[i] for i in path]
+
+    def save(self, filepath):
+        """Writes the index to a binary file so later runs can skip preprocessing."""
+        header = {"names": self.names, "num_edges": len(self.neighbors), "byteorder": sys.byteorder}
+        tmp_path = filepath + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(self.MAGIC)
+            f.write(json.dumps(header).encode("utf-8") + b"\n")
+            self.offsets.tofile(f)
+            self.neighbors.tofile(f)
+            self.parents.tofile(f)
+        os.replace(tmp_path, filepath)
+
+    @classmethod
+    def load(cls, filepath):
+        """Reads an index previously written by save()."""
+        with open(filepath, 'rb') as f:
+            if f.readline() != cls.MAGIC:
+                raise ValueError(f"{filepath} is not a metro route index")
+            header = json.loads(f.readline())
+            num_stations = len(header["names"])
+
+            arrays = []
+            for count in (num_stations + 1, header["num_edges"], num_stations * num_stations):
+                values = array('i')
+                values.fromfile(f, count)
+                if header["byteorder"] != sys.byteorder:
+                    values.byteswap()
+                arrays.append(values)
+        return cls(header["names"], *arrays)
+
+def load_route_index(map_path, index_path=None):
+    """Loads a saved index if it is up to date, otherwise builds (and saves) a new one."""
+    if index_path and os.path.exists(index_path) and \
+            os.path.getmtime(index_path) >= os.path.getmtime(map_path):
+        return RouteIndex.load(index_path)
+
+    index = RouteIndex.from_map_file(map_path)
+    if index_path:
+        index.save(index_path)
+    return index
+
+def answer_queries(index, infile, outfile):
+    """Answers one "start end" query per input line."""
+    results = []
+    for line in infile:
+        parts = line.split()
+        if not parts:
+            continue
+        if len(parts) != 2:
+            results.append("Invalid input. Please enter start and end stations separated by a space.")
+            continue
+        path = index.find_path(parts[0], parts[1])
+        results.append(" -> ".join(path) if path else "No path found!")
+
+        if len(results) >= 4096:
+            outfile.write("\n".join(results) + "\n")
+            results = []
+    if results:
+        outfile.write("\n".join(results) + "\n")
+
+# --- Benchmark on generated metro networks ---
+
+def _find_path_copying(graph, start, end):
+    """The original BFS that copies the whole path into every queue entry (for comparison)."""
+    if start not in graph or end not in graph:
+        return None
     queue = deque([[start]])
-    # A set to keep track of visited stations to avoid cycles
     visited = {start}
-
     while queue:
         path = queue.popleft()
         current_station = path[-1]
-
         if current_station == end:
-            return path # Path found
-
+            return path
         for neighbor in graph.get(current_station, []):
             if neighbor not in visited:
                 visited.add(neighbor)
                 new_path = list(path)
                 new_path.append(neighbor)
                 queue.append(new_path)
-    
-    return None # No path found
+    return None
+
+def generate_metro_network(num_stations, line_length=40, extra_transfers=0.02, seed=0):
+    """
+    Builds a random connected metro map as an adjacency list. Each new line
+    starts at an existing station and runs through line_length new ones;
+    a small fraction of extra transfer links adds loops to the network.
+    """
+    rng = random.Random(seed)
+    names = [f"S{i}" for i in range(num_stations)]
+    graph = {name: [] for name in names}
+
+    def connect(a, b):
+        graph[names[a]].append(names[b])
+        graph[names[b]].append(names[a])
+
+    next_station = 1
+    while next_station < num_stations:
+        previous = rng.randrange(next_station) # transfer station for the new line
+        for _ in range(line_length):
+            if next_station >= num_stations:
+                break
+            connect(previous, next_station)
+            previous = next_station
+            next_station += 1
+
+    for _ in range(int(num_stations * extra_transfers)):
+        a, b = rng.randrange(num_stations), rng.randrange(num_stations)
+        if a != b:
+            connect(a, b)
+
+    return graph
+
+def benchmark(sizes=(10_000, 100_000, 1_000_000), queries=5, naive_limit=100_000):
+    """Times the copying BFS, the parent-pointer BFS and the bidirectional BFS."""
+    searches = [("copying", _find_path_copying), ("parents", find_path),
+                ("bidirectional", find_path_bidirectional)]
+
+    for size in sizes:
+        graph = generate_metro_network(size)
+        rng = random.Random(size)
+        pairs = [(f"S{rng.randrange(size)}", f"S{rng.randrange(size)}") for _ in range(queries)]
+        print(f"\n{size} stations, {queries} queries:")
+
+        lengths = None
+        for name, search in searches:
+            if search is _find_path_copying and size > naive_limit:
+                continue
+            start_time = time.perf_counter()
+            results = [search(graph, a, b) for a, b in pairs]
+            elapsed = time.perf_counter() - start_time
+
+            # Every variant must find routes with the same number of stops
+            result_lengths = [len(p) for p in results]
+            if lengths is None:
+                lengths = result_lengths
+            elif result_lengths != lengths:
+                print(f"  Warning: {name} found paths of different lengths!")
+            print(f"  {name:>13}: {elapsed / queries * 1000:.2f} ms/query")
 
 # Main script execution
 if __name__ == "__main__":
+    # Usage:
+    #   python sol.py                                   -> one query on the built-in map (judge mode)
+    #   python sol.py --map FILE [--index FILE] < queries -> many queries on a map file
+    #   python sol.py --bench                           -> BFS benchmark on generated networks
+    if len(sys.argv) > 1 and sys.argv[1] == "--bench":
+        benchmark()
+        sys.exit()
+    if len(sys.argv) > 2 and sys.argv[1] == "--map":
+        index_path = sys.argv[4] if len(sys.argv) > 4 and sys.argv[3] == "--index" else None
+        route_index = load_route_index(sys.argv[2], index_path)
+        answer_queries(route_index, sys.stdin, sys.stdout)
+        sys.exit()
+
     # The metro map is hardcoded as an adjacency list
     metro_graph = {
         'Tajrish': ['Gheytariyeh'],
@@ -40,13 +347,13 @@ if __name__ == "__main__":
 
     try:
         start_station, end_station = input().split()
-        
+
         path = find_path(metro_graph, start_station, end_station)
-        
+
         if path:
             print(" -> ".join(path))
         else:
             print("No path found!")
-            
+
     except (ValueError, IndexError):
-        print("Invalid input. Please enter start and end stations separated by a space.")
\ No newline at end of file
+        print("Invalid input. Please enter start and end stations separated by a space.")
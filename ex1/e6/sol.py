@@ -1,54 +1,278 @@
+import math
+import os
 import sys
+from multiprocessing import Pool
+
+# Bytes read from the input per chunk in streaming mode
+CHUNK_BYTES = 1 << 20
+# Mantissas multiplied per block; 0.5**1000 is still a normal float
+_PRODUCT_BLOCK = 1000
 
 # PART 1: The Function Definition (The "Brain")
 # This part defines WHAT to do, but doesn't run on its own.
-def universal_calculator(*args, **kwargs):
+def _scaled_product(values, mantissa=1.0, exponent=0):
     """
-    Calculates the sum or product of a variable number of arguments,
-    with an option to round the result.
+    Multiplies values into a running product kept as mantissa * 2**exponent,
+    so intermediate results can never overflow or underflow.
     """
-    if kwargs.get('operation') == 'multiply':
-        result = 1
-        for num in args:
-            result *= num
-    else:
-        result = sum(args)
+    for i in range(0, len(values), _PRODUCT_BLOCK):
+        mantissas, exponents = zip(*map(math.frexp, values[i:i + _PRODUCT_BLOCK]))
+        mantissa, shift = math.frexp(mantissa * math.prod(mantissas))
+        exponent += shift + sum(exponents)
+    return mantissa, exponent
+
+def _finish_product(mantissa, exponent):
+    """Turns a scaled product back into a float, giving +/-inf if it is too large."""
+    try:
+        return math.ldexp(mantissa, exponent)
+    except OverflowError:
+        return math.copysign(math.inf, mantissa)
+
+def _compensated_sum(values):
+    """fsum, falling back to a plain sum when the total overflows to +/-inf."""
+    try:
+        return math.fsum(values)
+    except (OverflowError, ValueError):
+        return sum(values)
 
+def _exact_partials(values, partials=()):
+    """
+    A short list of floats whose exact sum is sum(partials) + sum(values),
+    so a sum can be carried across chunks (or processes) without rounding.
+    fsum is correctly rounded, so each round peels off the float nearest to
+    what is still missing until nothing is. Overflow falls back to a plain sum.
+    """
+    terms = list(partials)
+    terms.extend(values)
+    result = []
+    try:
+        while True:
+            head = math.fsum(terms + [-p for p in result])
+            if head == 0 or not math.isfinite(head):
+                return result if head == 0 else [head]
+            result.append(head)
+    except (OverflowError, ValueError):
+        return [sum(terms)]
+
+def _apply_rounding(result, kwargs):
+    """Rounds the result if a valid round_to argument was given."""
     if 'round_to' in kwargs:
         try:
             decimal_places = int(kwargs['round_to'])
             result = round(result, decimal_places)
         except (ValueError, TypeError):
             pass
-
     return result
 
+def universal_calculator(*args, **kwargs):
+    """
+    Calculates the sum or product of a variable number of arguments,
+    with an option to round the result.
+    """
+    # Plain integers are already exact, so only floats need the careful path
+    exact = all(isinstance(num, int) for num in args)
+
+    if kwargs.get('operation') == 'multiply':
+        result = math.prod(args) if exact else _finish_product(*_scaled_product(args))
+    else:
+        # fsum tracks the rounding error of every addition
+        result = sum(args) if exact else _compensated_sum(args)
+
+    return _apply_rounding(result, kwargs)
+
+# --------------------------------------------------------------------
+
+# PART 1b: Streaming reduction for very large inputs
+# The numbers are never stored all at once: they are parsed a chunk at a
+# time and folded into both a running sum and a running product, because
+# the operation is only known after the (possibly huge) first line.
+
+class _StreamState:
+    """Running totals for one stretch of numbers."""
+
+    def __init__(self):
+        self.mantissa, self.exponent = 1.0, 0
+        self.partials = [] # exact running sum, see _exact_partials
+        self.count = 0
+        self.invalid = False
+        self.rest = ""
+
+    @property
+    def total(self):
+        return _compensated_sum(self.partials)
+
+def _reduce_chunks(chunks, state):
+    """Consumes lists of floats, updating the running product and sum."""
+    for chunk in chunks:
+        state.mantissa, state.exponent = _scaled_product(chunk, state.mantissa, state.exponent)
+        state.partials = _exact_partials(chunk, state.partials)
+        state.count += len(chunk)
+    return state
+
+def _parse_numbers(text, state):
+    """Parses one chunk of the first line; a bad token invalidates the whole line."""
+    if state.invalid:
+        return []
+    try:
+        return list(map(float, text.split()))
+    except ValueError:
+        state.invalid = True
+        return []
+
+def _iter_first_line_chunks(stream, state, chunk_bytes):
+    """
+    Yields the numbers of the first input line chunk by chunk. Whatever
+    follows the first newline is collected in state.rest for the kwargs.
+    """
+    leftover = ""
+    while True:
+        block = stream.read(chunk_bytes)
+        if not block:
+            numbers = _parse_numbers(leftover, state)
+            if numbers:
+                yield numbers
+            return
+
+        block = leftover + block
+        newline = block.find("\n")
+        if newline != -1:
+            numbers = _parse_numbers(block[:newline], state)
+            if numbers:
+                yield numbers
+            state.rest = block[newline + 1:] + stream.read()
+            return
+
+        # Keep a token that may be cut in half for the next block
+        cut = max(block.rfind(" "), block.rfind("\t")) + 1
+        leftover = block[cut:]
+        numbers = _parse_numbers(block[:cut], state)
+        if numbers:
+            yield numbers
+
+def _parse_kwargs(lines):
+    """Parses key=value lines into a dict."""
+    kwargs = {}
+    for line in lines:
+        line = line.strip()
+        if '=' in line:
+            key, value = line.split('=', 1)
+            kwargs[key] = value
+    return kwargs
+
+def _finish(state, kwargs):
+    """Picks the requested reduction from a finished stream state."""
+    if state.invalid or state.count == 0:
+        # Same as the original script: an empty or unparsable first line means no arguments
+        return universal_calculator(**kwargs)
+    if kwargs.get('operation') == 'multiply':
+        result = _finish_product(state.mantissa, state.exponent)
+    else:
+        result = state.total
+    return _apply_rounding(result, kwargs)
+
+def stream_calculate(stream, chunk_bytes=CHUNK_BYTES):
+    """Runs universal_calculator over a text stream without loading it into memory."""
+    state = _StreamState()
+    _reduce_chunks(_iter_first_line_chunks(stream, state, chunk_bytes), state)
+    return _finish(state, _parse_kwargs(state.rest.splitlines()))
+
+def _reduce_file_segment(task):
+    """
+    Worker: reduces the numbers of the first line that start inside the
+    byte range [start, end) of the file. Returns the partial results and
+    the offset of the first newline, if the segment contains it.
+    """
+    filepath, start, end, chunk_bytes = task
+    state = _StreamState()
+    newline_at = -1
+
+    def chunks():
+        nonlocal newline_at
+        with open(filepath, 'rb') as f:
+            position = start
+            if start > 0:
+                # Skip a token that began in the previous segment
+                f.seek(start - 1)
+                if not f.read(1).isspace():
+                    while True:
+                        byte = f.read(1)
+                        if not byte or byte.isspace():
+                            break
+                        position += 1
+                    f.seek(position)
+
+            leftover = b""
+            while position < end:
+                block = f.read(min(chunk_bytes, end - position))
+                if not block:
+                    break
+                newline = block.find(b"\n")
+                if newline != -1:
+                    newline_at = position + newline
+                    yield _parse_numbers((leftover + block[:newline]).decode(), state)
+                    return
+                position += len(block)
+                block = leftover + block
+                cut = max(block.rfind(b" "), block.rfind(b"\t")) + 1
+                leftover = block[cut:]
+                yield _parse_numbers(block[:cut].decode(), state)
+
+            # Finish a token that runs past the end of the segment
+            while leftover:
+                byte = f.read(1)
+                if not byte or byte.isspace():
+                    if byte == b"\n":
+                        newline_at = f.tell() - 1
+                    break
+                leftover += byte
+            yield _parse_numbers(leftover.decode(), state)
+
+    _reduce_chunks(chunks(), state)
+    return state.partials, state.mantissa, state.exponent, state.count, state.invalid, newline_at
+
+def parallel_calculate(filepath, workers, chunk_bytes=CHUNK_BYTES):
+    """
+    Splits the first line of a large input file across worker processes.
+    Each worker returns its exact partial sum and its scaled product, which
+    are combined in order. The sum is exact until the final rounding, so it
+    matches the streaming mode; the product may still differ in the last
+    bit because the numbers are grouped differently.
+    """
+    size = os.path.getsize(filepath)
+    step = max(1, -(-size // workers))
+    tasks = [(filepath, lo, min(lo + step, size), chunk_bytes) for lo in range(0, size, step)]
+
+    state = _StreamState()
+    newline_at = -1
+    with Pool(workers) as pool:
+        for partials, mantissa, exponent, count, invalid, newline_at in pool.imap(_reduce_file_segment, tasks):
+            state.partials = _exact_partials(partials, state.partials)
+            state.mantissa, shift = math.frexp(state.mantissa * mantissa)
+            state.exponent += exponent + shift
+            state.invalid = state.invalid or invalid
+            state.count += count
+            if newline_at != -1:
+                break # Everything after the first newline is kwargs
+
+    kwargs = {}
+    if newline_at != -1:
+        with open(filepath, 'r') as f:
+            f.seek(newline_at + 1)
+            kwargs = _parse_kwargs(f)
+    return _finish(state, kwargs)
+
 # --------------------------------------------------------------------
 
 # PART 2: The Script Execution (The "Engine")
 # This code runs when the judge executes the file.
 if __name__ == "__main__":
-    lines = sys.stdin.readlines()
-    
-    args = []
-    kwargs = {}
-
-    # Parse the input from stdin
-    if lines:
-        first_line = lines[0].strip()
-        if first_line:
-            try:
-                args = [float(x) for x in first_line.split()]
-            except ValueError:
-                args = []
-
-    if len(lines) > 1:
-        for i in range(1, len(lines)):
-            line = lines[i].strip()
-            if '=' in line:
-                key, value = line.split('=', 1)
-                kwargs[key] = value
+    # Usage:
+    #   python sol.py < input.txt                     -> streaming mode
+    #   python sol.py --workers N input.txt           -> split a big file across processes
+    if len(sys.argv) > 3 and sys.argv[1] == "--workers":
+        final_answer = parallel_calculate(sys.argv[3], int(sys.argv[2]))
+    else:
+        final_answer = stream_calculate(sys.stdin)
 
     # Call the function and print its result
-    final_answer = universal_calculator(*args, **kwargs)
-    print(final_answer)
\ No newline at end of file
+    print(final_answer)
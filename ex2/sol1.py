@@ -1,14 +1,85 @@
 # solution_q1.py
+import queue
+import random
+import sys
+import threading
+import time
+from array import array
+
+class Order:
+    """A compact order: each pizza is stored as a one-byte menu code."""
+
+    __slots__ = ('pizzas',)
+
+    def __init__(self, pizza_names, menu_codes):
+        try:
+            self.pizzas = array('B', [menu_codes[name] for name in pizza_names])
+        except KeyError as e:
+            raise ValueError(f"Sorry, {e.args[0]} is not on the menu.") from None
+
+    def __len__(self):
+        return len(self.pizzas)
+
+class Receipt:
+    """The priced result of one order, without any console output."""
+
+    __slots__ = ('branch_name', 'tariff', 'pizzas', 'total', '_price_table', '_names')
+
+    def __init__(self, shop, pizzas, total):
+        self.branch_name = shop.name
+        self.tariff = shop.tariff
+        self.pizzas = pizzas
+        self.total = total
+        # Shared with the shop, so a receipt does not copy any prices
+        self._price_table = shop.price_table()
+        self._names = shop.PIZZA_NAMES
+
+    def lines(self):
+        """Yields (pizza_name, price_after_tariff) for every pizza in the order."""
+        for code in self.pizzas:
+            yield self._names[code], self._price_table[code]
 
 class PizzaShop:
     """A base class for a pizza shop."""
-    
+
     # The base menu is a class attribute shared by all instances
     MENU = {'pepperoni': 150, 'margherita': 120, 'vegetable': 95}
-    
+    # Integer codes for the menu, used to store orders compactly
+    PIZZA_NAMES = tuple(MENU)
+    MENU_CODES = {name: code for code, name in enumerate(PIZZA_NAMES)}
+    BASE_PRICES = tuple(MENU.values())
+
     def __init__(self, name):
         self.name = name
         self.current_order = []
+        self._prices = None
+
+    def price_table(self):
+        """Returns the menu prices after this branch's tariff, indexed by menu code."""
+        # Computed once per branch, since the tariff never changes
+        if self._prices is None:
+            self._prices = tuple(price * self.tariff for price in self.BASE_PRICES)
+        return self._prices
+
+    def make_order(self, pizza_names):
+        """Builds a compact Order from pizza names (raises ValueError for unknown pizzas)."""
+        return Order(pizza_names, self.MENU_CODES)
+
+    def price_orders(self, orders):
+        """
+        Prices many orders at once and returns one Receipt per order.
+        Orders may be Order objects or plain lists of pizza names.
+        """
+        base_prices = self.BASE_PRICES
+        tariff = self.tariff
+        receipts = []
+        for order in orders:
+            if not isinstance(order, Order):
+                order = self.make_order(order)
+            # Same formula as calculate_total: tariff applied to the base sum
+            base_price = sum(map(base_prices.__getitem__, order.pizzas))
+            receipts.append(Receipt(self, order.pizzas, base_price * tariff))
+        return receipts
 
     def add_to_order(self, pizza_name):
         """Adds a pizza to the current order if it's on the menu."""
@@ -20,17 +91,15 @@ class PizzaShop:
 
     def calculate_total(self):
         """Calculates the total price of the order using the instance's tariff."""
-        base_price = sum(self.MENU[pizza] for pizza in self.current_order)
-        # self.tariff is defined in the child classes
-        final_price = base_price * self.tariff
-        
+        receipt = self.price_orders([self.current_order])[0]
+
         print(f"\nOrder at {self.name} (Tariff: {self.tariff}):")
-        for pizza in self.current_order:
+        for pizza, price in receipt.lines():
              # Show the price for each pizza after applying the tariff
-             print(f"- {pizza.title()} Pizza: {self.MENU[pizza] * self.tariff}")
-        print(f"Total Price: {final_price}")
+             print(f"- {pizza.title()} Pizza: {price}")
+        print(f"Total Price: {receipt.total}")
         print("---")
-        
+
         # Clear the order for the next customer
         self.current_order = []
 
@@ -49,17 +118,191 @@ class ShirazBranch(PizzaShop):
         super().__init__(name="Shiraz Branch")
         self.tariff = 0.95 # 5% discount
 
+# --- Concurrent order intake for many branches ---
+
+class OrderPipeline:
+    """
+    Feeds orders for many branches through queues to a pool of worker
+    threads. Each branch is owned by exactly one worker, so a branch's
+    state is only ever touched by a single thread and needs no locks.
+    Every submitted order gets an id and ends up exactly once in either
+    results (as a receipt) or failed (with the error that stopped it).
+    """
+
+    def __init__(self, branches, num_workers=4, batch_size=256):
+        self.branches = list(branches)
+        self.num_workers = max(1, min(num_workers, len(self.branches)))
+        self.batch_size = batch_size
+        self._queues = [queue.Queue() for _ in range(self.num_workers)]
+        # Per-worker results, merged only after the workers have stopped
+        self._results = [[] for _ in range(self.num_workers)]
+        self._failed = [[] for _ in range(self.num_workers)]
+        self._crashes = [None] * self.num_workers
+        self.results = []
+        self.failed = []
+        self._next_id = 0
+        self._id_lock = threading.Lock()
+        self._threads = []
+
+    def start(self):
+        for worker_id in range(self.num_workers):
+            thread = threading.Thread(target=self._work, args=(worker_id,), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def submit(self, branch_index, pizza_names):
+        """
+        Queues an order for a branch and returns its order id. Unknown
+        pizzas raise ValueError here, before the order gets an id.
+        """
+        order = self.branches[branch_index].make_order(pizza_names)
+        with self._id_lock:
+            order_id = self._next_id
+            self._next_id += 1
+        # Branch i always goes to worker i % num_workers
+        self._queues[branch_index % self.num_workers].put(
+            (order_id, branch_index, order, time.perf_counter()))
+        return order_id
+
+    def _work(self, worker_id):
+        try:
+            self._work_loop(worker_id)
+        except BaseException as e:
+            # Reported by close(); the orders still queued for this worker are lost
+            self._crashes[worker_id] = e
+
+    def _work_loop(self, worker_id):
+        """Worker loop: drains its queue in batches and prices them per branch."""
+        intake = self._queues[worker_id]
+        results = self._results[worker_id]
+        failed = self._failed[worker_id]
+        running = True
+        while running:
+            batch = [intake.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(intake.get_nowait())
+                except queue.Empty:
+                    break
+
+            by_branch = {}
+            for item in batch:
+                if item is None:
+                    running = False # Shutdown sentinel
+                    continue
+                by_branch.setdefault(item[1], []).append(item)
+
+            for branch_index, items in by_branch.items():
+                shop = self.branches[branch_index]
+                try:
+                    receipts = shop.price_orders([item[2] for item in items])
+                except Exception:
+                    # Price the orders one by one, so only the bad ones fail
+                    receipts = []
+                    for order_id, _, order, _ in items:
+                        try:
+                            receipts.append(shop.price_orders([order])[0])
+                        except Exception as e:
+                            receipts.append(None)
+                            failed.append((order_id, e))
+                done = time.perf_counter()
+                for (order_id, _, _, submitted), receipt in zip(items, receipts):
+                    if receipt is not None:
+                        results.append((order_id, receipt, done - submitted))
+
+    def close(self):
+        """
+        Waits for all queued orders and returns [(order_id, receipt, latency_s)]
+        sorted by id; orders that could not be priced are in failed as
+        (order_id, error). Raises RuntimeError if a worker died and orders were lost.
+        """
+        if self._threads:
+            for intake in self._queues:
+                intake.put(None)
+            for thread in self._threads:
+                thread.join()
+            self._threads = []
+            self.results = [result for results in self._results for result in results]
+            self.results.sort(key=lambda result: result[0])
+            self.failed = [failure for failed in self._failed for failure in failed]
+            self.failed.sort(key=lambda failure: failure[0])
+
+            crashes = [e for e in self._crashes if e is not None]
+            missing = self._next_id - len(self.results) - len(self.failed)
+            if crashes or missing:
+                raise RuntimeError(f"{len(crashes)} worker(s) stopped and {missing} order(s) "
+                                   f"were lost") from (crashes[0] if crashes else None)
+        return self.results
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def _percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+def benchmark(num_orders=100_000, branch_counts=(2, 8, 32), worker_counts=(1, 2, 4, 8)):
+    """Reports orders/second and latency percentiles as branches and workers scale."""
+    rng = random.Random(0)
+    names = list(PizzaShop.MENU)
+    orders = [[rng.choice(names) for _ in range(rng.randrange(1, 6))] for _ in range(num_orders)]
+
+    print(f"{'branches':>8} {'workers':>7} {'orders/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for num_branches in branch_counts:
+        branches = [TehranBranch() if i % 2 == 0 else ShirazBranch() for i in range(num_branches)]
+        for num_workers in worker_counts:
+            if num_workers > num_branches:
+                continue # Extra workers would have no branch to own
+            pipeline = OrderPipeline(branches, num_workers=num_workers).start()
+            start = time.perf_counter()
+            for i, order in enumerate(orders):
+                pipeline.submit(i % num_branches, order)
+            results = pipeline.close()
+            elapsed = time.perf_counter() - start
+
+            # Every order must come back exactly once
+            if [result[0] for result in results] != list(range(num_orders)):
+                print("Warning: orders were lost or duplicated!")
+
+            latencies = sorted(result[2] * 1000 for result in results)
+            print(f"{num_branches:>8} {pipeline.num_workers:>7} {num_orders / elapsed:>10,.0f} "
+                  f"{_percentile(latencies, 0.50):>8.2f} {_percentile(latencies, 0.95):>8.2f} "
+                  f"{_percentile(latencies, 0.99):>8.2f}")
+
 # --- Main execution to demonstrate functionality ---
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--bench":
+        benchmark()
+        sys.exit()
+
     tehran_shop = TehranBranch()
     shiraz_shop = ShirazBranch()
-    
+
     # Place an order at the Tehran branch
     tehran_shop.add_to_order('pepperoni')
     tehran_shop.add_to_order('margherita')
     tehran_shop.calculate_total()
-    
+
     # Place an order at the Shiraz branch
     shiraz_shop.add_to_order('pepperoni')
     shiraz_shop.add_to_order('vegetable')
-    shiraz_shop.calculate_total()
\ No newline at end of file
+    shiraz_shop.calculate_total()
+
+    # Price a whole batch of orders at once, without printing every line
+    batch = [['pepperoni', 'vegetable'], ['margherita'] * 3, ['vegetable', 'pepperoni', 'margherita']]
+    receipts = tehran_shop.price_orders(batch)
+    print(f"Batch of {len(receipts)} orders at {tehran_shop.name}: "
+          f"{[receipt.total for receipt in receipts]}")
+
+    # Take orders for both branches concurrently
+    with OrderPipeline([tehran_shop, shiraz_shop], num_workers=2) as pipeline:
+        for pizzas in batch:
+            pipeline.submit(0, pizzas)
+            pipeline.submit(1, pizzas)
+    print(f"Pipeline priced {len(pipeline.results)} orders: "
+          f"{[(result[1].branch_name, result[1].total) for result in pipeline.results[:2]]}")
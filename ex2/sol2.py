@@ -1,80 +1,1212 @@
 # solution_q2.py
+import atexit
 import json
+import mmap
 import os
+import struct
+import sys
+import threading
+import time
+from array import array
+
+# Journal entries allowed before dump() folds them into a fresh snapshot
+COMPACT_THRESHOLD = 1000
+# Pending changes that make the background writer flush before its interval
+FLUSH_THRESHOLD = 10000
+
+# Binary snapshot layout: magic, typecode + padding, seq, count, then the raw values
+BINARY_MAGIC = b"CLSTBIN1"
+BINARY_HEADER = struct.Struct("<8s c 7x Q Q")
+
+# First line of a lazy log file, followed by {"seq": ...} of the journal it includes
+LAZY_MAGIC = b"#CLSTLOG1"
+
+def _append_durably(f, data):
+    """
+    Appends data to an unbuffered file and fsyncs it. If that fails, the
+    file is cut back to its old size, so no torn record is left behind
+    and the same data can simply be written again.
+    """
+    size = f.seek(0, os.SEEK_END)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[f.write(view):]
+        os.fsync(f.fileno())
+    except BaseException:
+        f.truncate(size)
+        raise
+
+class _PendingWrites:
+    """
+    Changes to a _LazyRecords that are not on disk yet: the log lines that
+    continue the data file from offset base, and the index entries that
+    differ from the index file.
+    """
+
+    def __init__(self, base, truncate=False):
+        self.base = base
+        self.tail = bytearray()    # log lines from offset base on
+        self.replaced = {}         # index -> offset, for entries below held_from
+        self.held_from = None      # the index from here on is in held, not on disk
+        self.held = None
+        self.truncate = truncate   # empty both files first (clear())
+        self.count = 0             # writes collected here
+        self.length = None         # number of records once written (set by begin_sync)
+        self.written = False       # the tail is on disk, only the index is missing
+
+class _LazyRecords:
+    """
+    List storage backed by a file with one JSON record per line and a
+    sidecar index of 8-byte record offsets. Both files are memory-mapped,
+    so reading an item or a slice only parses the records involved, and
+    len() never touches the data at all. Nothing is loaded up front.
+
+    Writes do no file I/O: new records are collected in an in-memory tail
+    of the data file, replaced index entries in a dict, and once entries
+    shift (append, delete, slice assignment) the index from that point on
+    is held in memory (see _PendingWrites). That dirty part is all a sync
+    has to write. A sync sets it aside first, so writes and reads can go
+    on while it is written, and only the start and the end of a sync or
+    a compaction need the caller's lock.
+
+    The data file is also a log that can rebuild the index on its own:
+    after a LAZY_MAGIC header line, a plain record line is an append, and
+    edits are marked by lines starting with '#' (not valid JSON),
+    '#{"set": slice, "n": k}' before the k replacement records and
+    '#{"del": slice}'. The index starts with the size of the data file it
+    matches, so after a crash or a lost index the mismatch is noticed and
+    the log is replayed. Only files that start with LAZY_MAGIC are opened
+    (CustomizedList converts other list files first).
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.index_path = filepath + ".idx"
+        self.garbage = 0 # superseded records and edit lines in the data file
+        self._data_map = None
+        self._index_map = None
+        self._index_view = None
+
+        if not os.path.exists(filepath) or os.path.getsize(filepath) == 0:
+            with open(filepath, 'wb') as f:
+                f.write(self.header())
+        with open(filepath, 'rb') as f:
+            header = f.readline()
+        if not header.startswith(LAZY_MAGIC) or not header.endswith(b"\n"):
+            raise ValueError(f"{filepath} is not a lazy list file")
+        self.seq = json.loads(header[len(LAZY_MAGIC):])["seq"]
+        self._header_size = len(header)
+        if not self._index_matches_data():
+            self._rebuild_index()
+        self._open_files()
+        self._writes = _PendingWrites(os.path.getsize(filepath))
+        self._syncing = None # the changes a sync is writing right now
+        self._length = self._stored = os.path.getsize(self.index_path) // 8 - 1
+
+    def _open_files(self):
+        self._data_file = open(self.filepath, 'a+b', buffering=0)
+        self._index_file = open(self.index_path, 'r+b')
+
+    @staticmethod
+    def header(seq=0):
+        """The first line of a log file; seq is the last journal entry its records include."""
+        return LAZY_MAGIC + b" " + json.dumps({"seq": seq}).encode("ascii") + b"\n"
+
+    @staticmethod
+    def is_log(filepath):
+        with open(filepath, 'rb') as f:
+            return f.read(len(LAZY_MAGIC)) == LAZY_MAGIC
+
+    @property
+    def pending(self):
+        """Writes not yet synced (not counting a sync in progress)."""
+        return self._writes.count
+
+    def _index_matches_data(self):
+        """True if the index header records the current size of the data file."""
+        try:
+            with open(self.index_path, 'rb') as f:
+                header = f.read(8)
+        except FileNotFoundError:
+            return False
+        return len(header) == 8 and \
+            array('Q', header)[0] == os.path.getsize(self.filepath)
+
+    def _rebuild_index(self):
+        """Replays the data file log into a fresh index, dropping a torn tail."""
+        offsets = array('Q')
+        lines = 0
+        with open(self.filepath, 'rb') as f:
+            position = good_size = len(f.readline()) # the header
+            replacing = None # [slice, number of new records, their offsets]
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break # A crash cut this line short
+                if line.startswith(b"#"):
+                    if replacing is not None:
+                        break
+                    lines += 1
+                    edit = json.loads(line[1:])
+                    if "del" in edit:
+                        del offsets[slice(*edit["del"])]
+                    else:
+                        replacing = [slice(*edit["set"]), edit["n"], array('Q')]
+                elif line.strip():
+                    lines += 1
+                    if replacing is None:
+                        offsets.append(position)
+                    else:
+                        replacing[2].append(position)
+                position += len(line)
+                if replacing is not None and len(replacing[2]) == replacing[1]:
+                    offsets[replacing[0]] = replacing[2]
+                    replacing = None
+                if replacing is None:
+                    good_size = position
+
+        # Anything after the last complete operation never happened
+        if good_size < os.path.getsize(self.filepath):
+            with open(self.filepath, 'r+b') as f:
+                f.truncate(good_size)
+        self.garbage = lines - len(offsets)
+        with open(self.index_path, 'wb') as f:
+            array('Q', [good_size]).tofile(f)
+            offsets.tofile(f)
+
+    # --- Memory maps (re-created lazily after syncs) ---
+
+    def _release_maps(self):
+        if self._index_view is not None:
+            self._index_view.release()
+            self._index_map.close()
+            self._index_view = self._index_map = None
+        if self._data_map is not None:
+            self._data_map.close()
+            self._data_map = None
+
+    def _stored_offsets(self):
+        """The index on disk as a memoryview of unsigned 64-bit offsets."""
+        if self._stored <= 0:
+            return memoryview(array('Q'))
+        if self._index_view is None:
+            self._index_map = mmap.mmap(self._index_file.fileno(), 0, access=mmap.ACCESS_READ)
+            # A sync may be writing the file; whole entries are all we need
+            entries = (len(self._index_map) - 8) // 8
+            self._index_view = memoryview(self._index_map)[8:8 + entries * 8].cast('Q')
+        return self._index_view
+
+    def _synced_offset(self, index):
+        """Offset of record number index once the sync in progress is done."""
+        syncing = self._syncing
+        if syncing is not None:
+            if syncing.held_from is not None and index >= syncing.held_from:
+                return syncing.held[index - syncing.held_from]
+            offset = syncing.replaced.get(index)
+            if offset is not None:
+                return offset
+        return self._stored_offsets()[index]
+
+    def _synced_offsets(self, lo, hi):
+        """Offsets lo..hi once the sync in progress is done, as a new array."""
+        offsets = array('Q')
+        syncing = self._syncing
+        split = hi
+        if syncing is not None and syncing.held_from is not None:
+            split = max(lo, min(hi, syncing.held_from))
+        if split > lo:
+            offsets.frombytes(self._stored_offsets()[lo:split].tobytes())
+        if split < hi:
+            offsets.extend(syncing.held[split - syncing.held_from:hi - syncing.held_from])
+        if syncing is not None:
+            for index, offset in syncing.replaced.items():
+                if lo <= index < split:
+                    offsets[index - lo] = offset
+        return offsets
+
+    def _offset(self, index):
+        """Offset of record number index, from the pending writes, a sync or the disk."""
+        writes = self._writes
+        if writes.held_from is not None and index >= writes.held_from:
+            return writes.held[index - writes.held_from]
+        offset = writes.replaced.get(index)
+        return self._synced_offset(index) if offset is None else offset
+
+    def _hold_from(self, position):
+        """Moves the index from position to the end into memory, so entries can shift."""
+        writes = self._writes
+        if writes.held_from is None:
+            writes.held_from, writes.held = self._length, array('Q')
+        if position < writes.held_from:
+            front = self._synced_offsets(position, writes.held_from)
+            for index in [i for i in writes.replaced if i >= position]:
+                front[index - position] = writes.replaced.pop(index)
+            writes.held = front + writes.held
+            writes.held_from = position
+        return writes.held
+
+    def _raw(self, offset):
+        """The bytes of the record starting at offset, including its newline."""
+        for writes in (self._writes, self._syncing):
+            if writes is not None and offset >= writes.base:
+                start = offset - writes.base
+                return bytes(writes.tail[start:writes.tail.index(b"\n", start) + 1])
+        if self._data_map is None:
+            self._data_map = mmap.mmap(self._data_file.fileno(), 0, access=mmap.ACCESS_READ)
+        end = self._data_map.find(b"\n", offset)
+        return self._data_map[offset:end + 1 if end != -1 else len(self._data_map)]
+
+    def _read(self, offset):
+        return json.loads(self._raw(offset))
+
+    @staticmethod
+    def _encode(value):
+        """One record line; raises before anything changes if value isn't JSON."""
+        return json.dumps(value).encode("utf-8") + b"\n"
+
+    def _add_line(self, line):
+        """Adds one record line to the tail of the data file and returns its offset."""
+        writes = self._writes
+        offset = writes.base + len(writes.tail)
+        writes.tail += line
+        return offset
+
+    def _add_edit(self, **edit):
+        """Adds a '#' edit line that tells a log replay what the next records replace."""
+        self._writes.tail += b"#" + json.dumps(edit).encode("utf-8") + b"\n"
+        self.garbage += 1
+
+    # --- List interface ---
+
+    def __len__(self):
+        return self._length
+
+    def _normalize(self, index):
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("list index out of range")
+        return index
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._read(self._offset(i)) for i in range(*index.indices(self._length))]
+        return self._read(self._offset(self._normalize(index)))
+
+    def __iter__(self):
+        for i in range(self._length):
+            yield self[i]
+
+    def __setitem__(self, index, value):
+        writes = self._writes
+        writes.count += 1
+        if isinstance(index, slice):
+            # Slice assignment follows the normal list rules on the held index
+            value = [self._encode(item) for item in value]
+            replaced = len(range(*index.indices(self._length)))
+            if index.step not in (None, 1) and len(value) != replaced:
+                raise ValueError(f"attempt to assign sequence of size {len(value)} "
+                                 f"to extended slice of size {replaced}")
+            self._add_edit(set=[index.start, index.stop, index.step], n=len(value))
+            offsets = array('Q', map(self._add_line, value))
+            held = self._hold_from(0)
+            held[index] = offsets
+            self._length = len(held)
+            self.garbage += replaced
+            return
+
+        index = self._normalize(index)
+        line = self._encode(value)
+        self._add_edit(set=[index, index + 1, None], n=1)
+        offset = self._add_line(line)
+        if writes.held_from is not None and index >= writes.held_from:
+            writes.held[index - writes.held_from] = offset
+        else:
+            writes.replaced[index] = offset
+        self.garbage += 1
+
+    def __delitem__(self, index):
+        self._writes.count += 1
+        if isinstance(index, slice):
+            held = self._hold_from(0)
+            del held[index]
+            self._add_edit(**{"del": [index.start, index.stop, index.step]})
+            self.garbage += self._length - len(held)
+            self._length = len(held)
+            return
+
+        index = self._normalize(index)
+        del self._hold_from(index)[index - self._writes.held_from]
+        self._add_edit(**{"del": [index, index + 1, None]})
+        self._length -= 1
+        self.garbage += 1
+
+    def append(self, value):
+        self._writes.count += 1
+        line = self._encode(value)
+        self._hold_from(self._length).append(self._add_line(line))
+        self._length += 1
+
+    def clear(self):
+        count = self._writes.count
+        self._writes = _PendingWrites(self._header_size, truncate=True)
+        self._writes.held_from, self._writes.held = 0, array('Q')
+        self._writes.count = count + 1
+        self._length = 0
+        self.garbage = 0
+
+    def __repr__(self):
+        return repr(list(self))
+
+    # --- Durability ---
+
+    @property
+    def dirty_range(self):
+        """(lo, hi) of the index entries the next sync writes (hi=None: to the end), or None."""
+        writes = self._writes
+        if writes.held_from is not None:
+            return (min(writes.replaced, default=writes.held_from), None)
+        if writes.replaced:
+            return (min(writes.replaced), max(writes.replaced) + 1)
+        return None
+
+    def begin_sync(self):
+        """
+        Sets the pending writes aside for write_sync() and returns them, or
+        None if there are none. New writes collect on top of them, and reads
+        see both until end_sync(). Call with the list locked.
+        """
+        writes = self._writes
+        if not writes.count:
+            return None
+        writes.length = self._length
+        self._syncing = writes
+        self._writes = _PendingWrites(writes.base + len(writes.tail))
+        return writes
+
+    def write_sync(self, writes):
+        """
+        Writes the tail of the data file, then the dirty part of the index,
+        each followed by an fsync. Until the index header is rewritten last,
+        it does not match the new data file size, so a crash in between
+        leads to a log replay on the next open. Runs without the lock: the
+        parts of the files that readers use don't change underneath them.
+        """
+        if writes.truncate:
+            # Index first: a missing header can't be mistaken for a valid one
+            self._index_file.truncate(0)
+            os.fsync(self._index_file.fileno())
+            self._data_file.truncate(self._header_size)
+        if writes.tail or writes.truncate:
+            _append_durably(self._data_file, writes.tail)
+        # A retry after a failed index write only has to write the index
+        writes.written = True
+
+        for index, offset in sorted(writes.replaced.items()):
+            self._index_file.seek(8 + index * 8)
+            array('Q', [offset]).tofile(self._index_file)
+        if writes.held_from is not None:
+            self._index_file.seek(8 + writes.held_from * 8)
+            writes.held.tofile(self._index_file)
+            self._index_file.truncate()
+        self._index_file.flush()
+        os.fsync(self._index_file.fileno())
+        self._index_file.seek(0)
+        array('Q', [writes.base + len(writes.tail)]).tofile(self._index_file)
+        self._index_file.flush()
+        os.fsync(self._index_file.fileno())
+
+    def end_sync(self, writes, ok):
+        """
+        Finishes a sync, with the list locked. If write_sync() failed (ok is
+        False), its writes go back into the pending ones for a retry, with
+        the whole index held, as the index file may be half written.
+        """
+        if ok:
+            self._stored = writes.length
+        elif not self._writes.truncate: # (after a clear() they don't matter)
+            self._hold_from(0)
+            if not writes.written:
+                self._writes.tail[:0] = writes.tail
+                self._writes.base = writes.base
+                self._writes.truncate = writes.truncate
+            self._writes.count += writes.count
+        self._syncing = None
+        self._release_maps()
+
+    def compact(self, lock):
+        """
+        Rewrites the data file as plain appends of the live records on disk.
+        The records are copied without holding lock; writes made meanwhile
+        stay pending, with their offsets moved over to the new file.
+        """
+        with lock:
+            if self._writes.truncate:
+                return # The next sync empties the file anyway
+            offsets = self._synced_offsets(0, self._stored)
+            old_size = self._writes.base
+            garbage = self.garbage
+
+        new_offsets = array('Q')
+        tmp_path = self.filepath + ".tmp"
+        with open(self.filepath, 'rb') as old, \
+                mmap.mmap(old.fileno(), 0, access=mmap.ACCESS_READ) as data, \
+                open(tmp_path, 'wb') as f:
+            f.write(self.header(self.seq))
+            for offset in offsets:
+                new_offsets.append(f.tell())
+                f.write(data[offset:data.find(b"\n", offset) + 1])
+            f.flush()
+            os.fsync(f.fileno())
+            size = f.tell()
+        with open(self.index_path + ".tmp", 'wb') as f:
+            array('Q', [size]).tofile(f)
+            new_offsets.tofile(f)
+            f.flush()
+            os.fsync(f.fileno())
+
+        with lock:
+            writes = self._writes
+            if writes.truncate:
+                os.remove(tmp_path)
+                os.remove(self.index_path + ".tmp")
+                return
+            # Pending records follow the new file instead; held entries that
+            # point into the old file are looked up among the copied records
+            shift = size - old_size
+            moved = None
+            if writes.held is not None:
+                for i, offset in enumerate(writes.held):
+                    if offset >= old_size:
+                        writes.held[i] = offset + shift
+                    else:
+                        if moved is None:
+                            moved = dict(zip(offsets[writes.held_from:], new_offsets[writes.held_from:]))
+                        writes.held[i] = moved[offset]
+            writes.replaced = {index: offset + shift for index, offset in writes.replaced.items()}
+            writes.base = size
+
+            self.close()
+            # If we crash between the two renames, the old index does not match
+            # the size of the new data file, so it is rebuilt from the new log
+            os.replace(tmp_path, self.filepath)
+            os.replace(self.index_path + ".tmp", self.index_path)
+            self._open_files()
+            self._stored = len(offsets)
+            self.garbage -= garbage
+
+    def close(self):
+        """Releases the files; unsynced writes are dropped (CustomizedList syncs first)."""
+        self._release_maps()
+        self._data_file.close()
+        self._index_file.close()
+
+class _TypedBuffer:
+    """
+    Unboxed storage for a list whose items are all ints (int64) or all
+    floats. A loaded binary snapshot is used in place through a private
+    (copy-on-write) memory map, so loading copies nothing; the buffer is
+    only copied into an array.array once the list has to change length.
+    """
+
+    def __init__(self, typecode, values=(), mapping=None, offset=0):
+        self.typecode = typecode
+        self._map = mapping
+        if mapping is not None:
+            self._array = None
+            self._view = memoryview(mapping)[offset:].cast(typecode)
+        else:
+            self._array = array(typecode, values)
+            self._view = None
+
+    @staticmethod
+    def typecode_for(values):
+        """'q' if every value is an int64, 'd' if every value is a float, else None."""
+        if not values:
+            return None
+        first = type(values[0])
+        if first is int:
+            if all(type(v) is int for v in values) and \
+                    -2 ** 63 <= min(values) and max(values) < 2 ** 63:
+                return 'q'
+        elif first is float:
+            if all(type(v) is float for v in values):
+                return 'd'
+        return None
+
+    def accepts(self, value):
+        if self.typecode == 'q':
+            return type(value) is int and -2 ** 63 <= value < 2 ** 63
+        return type(value) is float
+
+    def _items(self):
+        return self._view if self._view is not None else self._array
+
+    def _materialize(self):
+        """Copies a memory-mapped buffer into an array that can grow and shrink."""
+        if self._view is not None:
+            values = array(self.typecode)
+            values.frombytes(self._view.cast('B'))
+            self.close()
+            self._array = values
+
+    def __len__(self):
+        return len(self._items())
+
+    def __getitem__(self, index):
+        items = self._items()
+        if isinstance(index, slice):
+            return items[index].tolist()
+        return items[index]
+
+    def __iter__(self):
+        return iter(self._items())
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            self._materialize()
+            self._array[index] = array(self.typecode, value)
+        else:
+            self._items()[index] = value
+
+    def __delitem__(self, index):
+        self._materialize()
+        del self._array[index]
+
+    def append(self, value):
+        self._materialize()
+        self._array.append(value)
+
+    def clear(self):
+        self.close()
+        self._array = array(self.typecode)
+
+    def copy(self):
+        """A private array.array copy of the current values."""
+        if self._view is None:
+            return self._array[:]
+        values = array(self.typecode)
+        values.frombytes(self._view.cast('B'))
+        return values
+
+    def tolist(self):
+        return self._items().tolist()
+
+    def __repr__(self):
+        return repr(self.tolist())
+
+    def close(self):
+        """Releases the memory map, if the buffer still uses one."""
+        if self._view is not None:
+            self._view.release()
+            self._map.close()
+            self._view = self._map = None
 
 class CustomizedList:
-    """A list-like class that persists its data to a JSON file."""
-    
-    def __init__(self, filepath="list_data.json"):
+    """
+    A list-like class that persists its data to a JSON file.
+
+    Every change is recorded as an operation (append/set/delete/clear) and
+    saving only appends the new operations to a JSON-lines journal next to
+    the snapshot, so saving after a small edit costs O(edit). Once the
+    journal grows past compact_threshold entries it is folded into a new
+    snapshot, which is written to a temporary file and atomically renamed.
+
+    Mutations never touch the disk themselves: they only update the data,
+    the pending operations and the range of indices that became dirty.
+    Pass flush_interval (seconds) to start a background writer thread that
+    saves the pending changes on that interval, or as soon as
+    flush_threshold of them pile up. flush(), close() or leaving a ``with``
+    block guarantees that everything is on disk. Pending changes are only
+    dropped once they are durable, so a failed flush can simply be retried.
+
+    When every item is an int (int64) or every item is a float, the list is
+    kept unboxed in memory (see _TypedBuffer) and snapshots are written as a
+    small header plus the raw values, which load through a memory map with
+    no copying. Storing anything else switches back to a plain list and
+    JSON snapshots automatically.
+
+    With lazy=True the list is instead stored one JSON record per line with
+    a memory-mapped offset index (see _LazyRecords): opening a huge list is
+    instant and items are read on demand. Writes are buffered in memory as
+    new records plus the dirty range of the index, which flushing writes.
+    Every read returns a fresh copy, so change an item by assigning it back.
+    """
+
+    def __init__(self, filepath="list_data.json", compact_threshold=COMPACT_THRESHOLD, lazy=False,
+                 flush_interval=None, flush_threshold=FLUSH_THRESHOLD):
         """Initializes the list, loading from the file if it exists."""
         self.filepath = filepath
+        self.journal_path = filepath + ".journal"
+        self.compact_threshold = compact_threshold
+        self.flush_threshold = flush_threshold
+        self.lazy = lazy
         self._data = []
+        self._seq = 0            # sequence number of the last recorded operation
+        self._pending = []       # operations not yet written to the journal
+        self._journal_ops = 0    # operations currently stored in the journal
+        self._dirty = None       # (lo, hi) indices changed since the last flush; hi=None means "to the end"
+        self._nested = False     # holds dicts or lists, which can change without the journal seeing it
+
+        self._lock = threading.RLock()     # guards the data and the pending changes
+        self._io_lock = threading.Lock()   # one flush/compaction at a time
+        self._wake = threading.Event()
+        self._stop = False
+        self._writer = None
+
         self.load()
+        if flush_interval is not None:
+            self.start_background_flush(flush_interval)
+
+    # --- Persistence ---
 
     def load(self):
-        """Loads data from the JSON file into the internal list."""
-        if os.path.exists(self.filepath):
+        """Loads the snapshot and replays the journal on top of it."""
+        with self._lock:
+            self._dirty = None
+            if self.lazy:
+                # Only the files are opened; records are read when accessed
+                if isinstance(self._data, _LazyRecords):
+                    self._data.close()
+                self._data = []
+                if self._needs_lazy_conversion():
+                    self._convert_to_lazy_log()
+                self._data = _LazyRecords(self.filepath)
+                return
+            self._load_items(strict=False)
+
+    def _load_items(self, strict):
+        """
+        Reads a JSON, binary or lazy log snapshot and replays the journal.
+        A file that can't be parsed is treated as empty, unless strict.
+        """
+        if isinstance(self._data, _TypedBuffer):
+            self._data.close()
+        self._data = []
+        self._seq = 0
+        self._pending = []
+        self._journal_ops = 0
+        self._nested = False
+
+        if os.path.exists(self.filepath) and self._is_binary_snapshot():
+            self._load_binary()
+        elif os.path.exists(self.filepath) and _LazyRecords.is_log(self.filepath):
+            records = _LazyRecords(self.filepath)
+            self._data, self._seq = list(records), records.seq
+            records.close()
+        elif os.path.exists(self.filepath):
             try:
                 with open(self.filepath, 'r') as f:
-                    self._data = json.load(f)
-            except (json.JSONDecodeError, FileNotFoundError):
+                    snapshot = json.load(f)
+                # Older files are a plain JSON list without a sequence number
+                if isinstance(snapshot, dict):
+                    self._data = snapshot["items"]
+                    self._seq = snapshot["seq"]
+                else:
+                    self._data = snapshot
+            except (json.JSONDecodeError, FileNotFoundError, KeyError) as e:
+                if strict and os.path.getsize(self.filepath):
+                    raise ValueError(f"{self.filepath} is not a CustomizedList file") from e
                 # If file is empty, corrupted, or can't be found, start fresh
                 self._data = []
+
+        self._replay_journal()
+        if isinstance(self._data, list):
+            self._nested = any(isinstance(item, (dict, list)) for item in self._data)
+        self._use_typed_storage_if_possible()
+
+    def _needs_lazy_conversion(self):
+        """True if the file is a JSON or binary snapshot, or the journal has entries."""
+        if os.path.exists(self.journal_path) and os.path.getsize(self.journal_path):
+            return True
+        return os.path.exists(self.filepath) and os.path.getsize(self.filepath) > 0 \
+            and not _LazyRecords.is_log(self.filepath)
+
+    def _convert_to_lazy_log(self):
+        """
+        Rewrites a list saved without lazy=True as a lazy log, once. The old
+        file is only replaced (atomically) after the log is complete; a file
+        that can't be parsed raises ValueError and is left alone.
+        """
+        self._load_items(strict=True)
+        tmp_path = self.filepath + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(_LazyRecords.header(self._seq))
+            for item in self._data:
+                f.write(json.dumps(item).encode("utf-8") + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+        if isinstance(self._data, _TypedBuffer):
+            self._data.close() # it maps the file being replaced
+        self._data = []
+        # The old index may happen to match the new file's size
+        if os.path.exists(self.filepath + ".idx"):
+            os.remove(self.filepath + ".idx")
+        os.replace(tmp_path, self.filepath)
+        # A crash before this point is harmless: the log's seq covers the journal
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'w'):
+                pass
+
+    def _is_binary_snapshot(self):
+        with open(self.filepath, 'rb') as f:
+            return f.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+
+    def _load_binary(self):
+        """Maps a binary snapshot straight into a _TypedBuffer (zero copy)."""
+        with open(self.filepath, 'rb') as f:
+            _, typecode, seq, count = BINARY_HEADER.unpack(f.read(BINARY_HEADER.size))
+            typecode = typecode.decode("ascii")
+            if count == 0:
+                self._data = _TypedBuffer(typecode)
+            else:
+                # ACCESS_COPY: edits stay private to this process until saved
+                mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+                self._data = _TypedBuffer(typecode, mapping=mapping, offset=BINARY_HEADER.size)
+        self._seq = seq
+
+    def _use_typed_storage_if_possible(self):
+        """Switches a plain list holding only ints or only floats to unboxed storage."""
+        if isinstance(self._data, list):
+            typecode = _TypedBuffer.typecode_for(self._data)
+            if typecode is not None:
+                self._data = _TypedBuffer(typecode, self._data)
+
+    def _make_room_for(self, values):
+        """
+        Falls back to a plain list before storing values the typed buffer
+        can't hold, and notes when a dict or list is stored (see dump()).
+        """
+        if not self._nested and any(isinstance(value, (dict, list)) for value in values):
+            self._nested = True
+        if isinstance(self._data, _TypedBuffer) and not all(map(self._data.accepts, values)):
+            typed = self._data
+            self._data = typed.tolist()
+            typed.close()
+
+    def _replay_journal(self):
+        """Applies journal entries newer than the snapshot, dropping a torn last line."""
+        if not os.path.exists(self.journal_path):
+            return
+
+        good_size = 0
+        with open(self.journal_path, 'rb') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break # A crash cut this entry short; nothing after it is valid
+                if not line.endswith(b"\n"):
+                    break
+                good_size += len(line)
+                self._journal_ops += 1
+                # Entries already folded into the snapshot are skipped
+                if entry["seq"] > self._seq:
+                    self._apply(entry)
+                    self._seq = entry["seq"]
+
+        if good_size < os.path.getsize(self.journal_path):
+            with open(self.journal_path, 'r+b') as f:
+                f.truncate(good_size)
+
+    def _apply(self, entry):
+        """Applies one recorded operation to the in-memory list."""
+        op = entry["op"]
+        if op == "append":
+            self._make_room_for([entry["value"]])
+            self._data.append(entry["value"])
+        elif op == "set":
+            value = entry["value"]
+            self._make_room_for(value if isinstance(entry["index"], dict) else [value])
+            self._data[self._decode_index(entry["index"])] = entry["value"]
+        elif op == "delete":
+            del self._data[self._decode_index(entry["index"])]
+        elif op == "clear":
+            self._data.clear()
+
+    @staticmethod
+    def _encode_index(index):
+        """Makes an int or slice index JSON-serializable."""
+        if isinstance(index, slice):
+            return {"slice": [index.start, index.stop, index.step]}
+        return index
+
+    @staticmethod
+    def _decode_index(index):
+        """Turns an index stored by _encode_index back into an int or slice."""
+        if isinstance(index, dict):
+            return slice(*index["slice"])
+        return index
+
+    # --- Change tracking (no file I/O) ---
+
+    @property
+    def dirty_range(self):
+        """
+        (lo, hi) of the indices changed since the last flush (hi=None: to the
+        end), or None if clean. In lazy mode this is the part of the offset
+        index the next flush writes; journal entries carry their own
+        positions, so otherwise it is informational, e.g. for callers that
+        mirror the list elsewhere.
+        """
+        if self.lazy:
+            return self._data.dirty_range
+        return self._dirty
+
+    def _mark_dirty(self, lo, hi):
+        if self.lazy:
+            return # Lazy storage tracks the dirty part of its index itself
+        if self._dirty is None:
+            self._dirty = (lo, hi)
         else:
-            self._data = []
+            old_lo, old_hi = self._dirty
+            self._dirty = (min(lo, old_lo), None if hi is None or old_hi is None else max(hi, old_hi))
+
+    def _record(self, op, **fields):
+        """Queues an operation for the next flush."""
+        if self.lazy:
+            # Lazy storage has already buffered the change in its own tail
+            if self._data.pending >= self.flush_threshold and self._writer is not None:
+                self._wake.set()
+            return
+        self._seq += 1
+        fields["seq"] = self._seq
+        fields["op"] = op
+
+        # Coalesce: a clear makes all earlier pending changes irrelevant, and
+        # repeated writes to one index only need the latest value
+        pending = self._pending
+        if op == "clear":
+            pending.clear()
+        elif op == "set" and pending and pending[-1]["op"] == "set" \
+                and isinstance(fields["index"], int) and pending[-1]["index"] == fields["index"]:
+            pending.pop()
+        pending.append(fields)
+
+        if len(pending) >= self.flush_threshold and self._writer is not None:
+            self._wake.set()
+
+    # --- Flushing ---
 
-    def dump(self):
-        """Saves the internal list's data to the JSON file."""
-        with open(self.filepath, 'w') as f:
-            json.dump(self._data, f, indent=4)
+    def flush(self):
+        """Writes all pending changes to disk and waits until they are durable."""
+        with self._io_lock:
+            if self.lazy:
+                # Set the buffered records and dirty index range aside under the
+                # lock, then let mutators and readers carry on while they're written
+                records = self._data
+                with self._lock:
+                    writes = records.begin_sync()
+                if writes is not None:
+                    try:
+                        records.write_sync(writes)
+                    except BaseException:
+                        with self._lock:
+                            records.end_sync(writes, ok=False)
+                        raise
+                    with self._lock:
+                        records.end_sync(writes, ok=True)
+                # Reclaim space once superseded records outnumber live ones
+                if records.garbage > len(records):
+                    records.compact(self._lock)
+                return
+
+            # Serialize under the lock, so no entry changes while it is encoded,
+            # then let mutators carry on while the journal is written
+            with self._lock:
+                entries = len(self._pending)
+                last_seq = self._pending[-1]["seq"] if entries else self._seq
+                dirty, self._dirty = self._dirty, None
+                try:
+                    payload = "".join(json.dumps(entry) + "\n" for entry in self._pending)
+                except (TypeError, ValueError):
+                    # A pending value that isn't JSON may have been replaced since;
+                    # then a snapshot of the current items still works
+                    payload = None
+
+            try:
+                if payload is None:
+                    self._compact()
+                    return
+                if payload:
+                    with open(self.journal_path, 'ab', buffering=0) as f:
+                        _append_durably(f, payload.encode("utf-8"))
+            except BaseException:
+                with self._lock:
+                    if dirty is not None:
+                        self._mark_dirty(*dirty)
+                raise
+
+            with self._lock:
+                # Entries recorded, coalesced or cleared meanwhile have newer seq numbers
+                self._pending = [entry for entry in self._pending if entry["seq"] > last_seq]
+            self._journal_ops += entries
+
+            if self._journal_ops > self.compact_threshold or not os.path.exists(self.filepath):
+                self._compact()
+
+    def dump(self, full=None):
+        """
+        Saves the list as it is now. Usually only the changes made since the
+        last save are appended to the journal, but an item changed in place
+        (my_list[0]['a'] = 2) never passes through the list, so while the
+        list holds dicts or lists, or with full=True, a full snapshot is
+        written instead. (Background flushes only save recorded changes.)
+        """
+        if full is None:
+            full = self._nested
+        if full and not self.lazy:
+            self.compact()
+        else:
+            self.flush()
         print(f"Data saved to {self.filepath}")
 
+    def compact(self):
+        """Writes a full snapshot (atomically) and empties the journal."""
+        with self._io_lock:
+            self._compact()
+
+    def _compact(self):
+        if self.lazy:
+            self._data.compact(self._lock)
+            return
+
+        # Every pending change is part of this copy, so none of them needs
+        # journaling once the snapshot is on disk. JSON is encoded under the
+        # lock, so nested items can't change halfway through.
+        with self._lock:
+            if isinstance(self._data, list):
+                self._nested = any(isinstance(item, (dict, list)) for item in self._data)
+            self._use_typed_storage_if_possible()
+            seq = self._seq
+            self._dirty = None
+            if isinstance(self._data, _TypedBuffer):
+                items = self._data.copy()
+            else:
+                items = json.dumps({"seq": seq, "items": list(self._data)}, indent=4)
+
+        tmp_path = self.filepath + ".tmp"
+        if isinstance(items, array):
+            with open(tmp_path, 'wb') as f:
+                f.write(BINARY_HEADER.pack(BINARY_MAGIC, items.typecode.encode("ascii"), seq, len(items)))
+                items.tofile(f)
+                f.flush()
+                os.fsync(f.fileno())
+        else:
+            with open(tmp_path, 'w') as f:
+                f.write(items)
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, self.filepath)
+        with self._lock:
+            self._pending = [entry for entry in self._pending if entry["seq"] > seq]
+
+        # A crash before this point is harmless: the journal entries are
+        # all older than the snapshot's seq and would be skipped on load
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'w'):
+                pass
+        self._journal_ops = 0
+
+    def start_background_flush(self, interval):
+        """Starts a daemon thread that flushes every interval seconds (or when woken)."""
+        if self._writer is not None:
+            return
+        self._stop = False
+        self._writer = threading.Thread(target=self._background_flush, args=(interval,), daemon=True)
+        self._writer.start()
+        # Don't lose the last changes if the program exits without close()
+        atexit.register(self.stop_background_flush)
+
+    def _background_flush(self, interval):
+        while not self._stop:
+            self._wake.wait(interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                # Nothing was dropped; the next interval (or close()) tries again
+                print(f"Background save to {self.filepath} failed: {e!r}")
+
+    def stop_background_flush(self):
+        """Stops the writer thread after a final flush."""
+        if self._writer is None:
+            return
+        self._stop = True
+        self._wake.set()
+        self._writer.join()
+        self._writer = None
+        atexit.unregister(self.stop_background_flush)
+        self.flush()
+
+    def close(self):
+        """Flushes everything, stops the writer thread and releases lazy storage files."""
+        self.stop_background_flush()
+        self.flush()
+        if isinstance(self._data, (_LazyRecords, _TypedBuffer)):
+            self._data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
     # --- Dunder methods to mimic list behavior ---
-    
+
+    # Reads take the lock too: a lazy list swaps its files and memory maps
+    # at the end of a flush
+
     def __len__(self):
-        return len(self._data)
+        with self._lock:
+            return len(self._data)
 
     def __getitem__(self, index):
         # This supports both indexing and slicing
-        return self._data[index]
+        with self._lock:
+            return self._data[index]
 
     def __setitem__(self, index, value):
-        self._data[index] = value
+        with self._lock:
+            length = len(self._data)
+            if isinstance(index, slice):
+                value = list(value) # Iterate only once, so the journal sees the same items
+                self._make_room_for(value)
+                positions = range(*index.indices(length))
+                self._data[index] = value
+                if len(self._data) != length:
+                    self._mark_dirty(positions.start, None) # later items moved
+                elif positions:
+                    self._mark_dirty(min(positions[0], positions[-1]), max(positions[0], positions[-1]) + 1)
+            else:
+                index = range(length)[index] # normalizes negative indices
+                self._make_room_for([value])
+                self._data[index] = value
+                self._mark_dirty(index, index + 1)
+            self._record("set", index=self._encode_index(index), value=value)
 
     def __delitem__(self, index):
-        del self._data[index]
-    
+        with self._lock:
+            length = len(self._data)
+            if isinstance(index, slice):
+                positions = range(*index.indices(length))
+                del self._data[index]
+                if positions:
+                    self._mark_dirty(min(positions[0], positions[-1]), None)
+            else:
+                index = range(length)[index]
+                del self._data[index]
+                self._mark_dirty(index, None)
+            self._record("delete", index=self._encode_index(index))
+
     def __str__(self):
-        return str(self._data)
-    
+        with self._lock:
+            return str(self._data)
+
     def __repr__(self):
-        return f"CustomizedList(filepath='{self.filepath}') -> {self._data}"
+        with self._lock:
+            return f"CustomizedList(filepath='{self.filepath}') -> {self._data}"
 
     # --- Standard list-like methods ---
-    
+
     def append(self, item):
-        self._data.append(item)
+        with self._lock:
+            self._make_room_for([item])
+            self._data.append(item)
+            self._mark_dirty(len(self._data) - 1, len(self._data))
+            self._record("append", value=item)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._mark_dirty(0, None)
+            self._record("clear")
+
+# --- Benchmark: JSON snapshots vs. the binary backend ---
+
+def _rss_mb():
+    """Resident memory of this process in MB (Linux only, else None)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, ValueError, IndexError):
+        return None
+
+def benchmark(count=1_000_000, filepath="bench_data.json"):
+    """Times saving and reloading count numbers as JSON and as a binary snapshot."""
+    values = [i * 0.5 for i in range(count)]
+    print(f"{count:,} floats")
+    print(f"{'backend':>8} {'dump s':>8} {'load s':>8} {'file MB':>8} {'RSS +MB':>8}")
+
+    def report(name, dump_time, load_time, rss_before, rss_after):
+        size = os.path.getsize(filepath) / 1e6
+        rss = f"{rss_after - rss_before:>8.1f}" if rss_before is not None else f"{'n/a':>8}"
+        print(f"{name:>8} {dump_time:>8.3f} {load_time:>8.3f} {size:>8.1f} {rss}")
+
+    try:
+        # The original format: the whole list as an indented JSON document
+        start = time.perf_counter()
+        with open(filepath, 'w') as f:
+            json.dump(values, f, indent=4)
+        dump_time = time.perf_counter() - start
+        rss_before = _rss_mb()
+        start = time.perf_counter()
+        with open(filepath) as f:
+            loaded = json.load(f)
+        load_time = time.perf_counter() - start
+        report("json", dump_time, load_time, rss_before, _rss_mb())
+        del loaded
+
+        for path in (filepath, filepath + ".journal"):
+            if os.path.exists(path):
+                os.remove(path)
+        typed_list = CustomizedList(filepath)
+        typed_list[:] = values
+        start = time.perf_counter()
+        typed_list.compact()
+        dump_time = time.perf_counter() - start
+        typed_list.close()
+        rss_before = _rss_mb()
+        start = time.perf_counter()
+        loaded = CustomizedList(filepath)
+        load_time = time.perf_counter() - start
+        report("binary", dump_time, load_time, rss_before, _rss_mb())
+        if loaded[count // 2] != values[count // 2]:
+            print("Warning: the binary snapshot did not round-trip!")
+        loaded.close()
+    finally:
+        for path in (filepath, filepath + ".journal", filepath + ".tmp"):
+            if os.path.exists(path):
+                os.remove(path)
 
 # --- Main execution to demonstrate functionality ---
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--bench":
+        benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000)
+        sys.exit()
+
     # --- Run 1: Create and modify the list ---
     print("--- First Run ---")
     my_list = CustomizedList("my_data.json")
     print(f"Initial list (may be empty or loaded from previous run): {my_list}")
 
     # Clear the list to start fresh for this demonstration
-    my_list._data = [] 
-    
+    my_list.clear()
+
     my_list.append(10)
     my_list.append("hello")
     my_list.append({'a': 1, 'b': 2})
     print(f"List after appending: {my_list}")
-    
+
     # Modify the list
     my_list[1] = "world"
     del my_list[0]
     print(f"List after modification: {my_list}")
-    
+
+    # Change the dict inside the list in place; the list itself never sees
+    # this, so dump() writes a full snapshot while the list holds dicts or lists
+    my_list[1]['b'] = 3
+
     # Save the final state to the disk
     my_list.dump()
     print("-" * 20)
@@ -85,4 +1217,14 @@ if __name__ == "__main__":
     persistent_list = CustomizedList("my_data.json")
     print(f"Loaded list from file: {persistent_list}")
     print(f"Length of loaded list: {len(persistent_list)}")
-    print(f"First item: {persistent_list[0]}")
\ No newline at end of file
+    print(f"First item: {persistent_list[0]}")
+    print("-" * 20)
+
+    # --- Run 3: Background saving ---
+    print("\n--- Third Run (Background Saving) ---")
+    # Changes are saved by a writer thread; leaving the block flushes the rest
+    with CustomizedList("my_data.json", flush_interval=0.5) as auto_list:
+        for i in range(5):
+            auto_list.append(i)
+        print(f"Unsaved index range right after appending: {auto_list.dirty_range}")
+    print(f"Reloaded after the with block: {CustomizedList('my_data.json')}")
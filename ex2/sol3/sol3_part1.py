@@ -1,6 +1,11 @@
 # generate_data.py
+import argparse
 import csv
 import math
+import time
+from multiprocessing import Pool
+
+import numpy as np
 
 # 1. Define physical constants and simulation parameters
 MASS = 0.5          # kg
@@ -14,27 +19,309 @@ TIME_END = 20
 TIME_STEP = 0.1
 FILENAME = "oscillator_data.csv"
 
-# 2. Prepare the data list
-data_to_write = []
-current_time = TIME_START
-
-while current_time <= TIME_END:
-    # Calculate position using the SHO formula
-    position = AMPLITUDE * math.cos(OMEGA * current_time + PHASE)
-    
-    # Append the (time, position) pair to our data list
-    data_to_write.append([current_time, position])
-    
-    current_time += TIME_STEP
-
-# 3. Write the data to a CSV file
-try:
-    with open(FILENAME, 'w', newline='') as f:
+# Samples computed and written at a time, so memory stays flat for any run length
+CHUNK_SAMPLES = 1 << 20
+
+# Optional parameter columns after (mass, k, amplitude, phase), used by the integrators;
+# missing columns are zero, which leaves the plain SHO
+ODE_COLUMNS = ("damping", "cubic", "drive_amplitude", "drive_omega")
+
+# 2. Exact time grid and vectorized positions
+def num_samples(start, end, step):
+    """Number of grid points start, start + step, ... that do not pass end."""
+    # The small tolerance keeps an end point that is a whole number of steps away
+    return int(math.floor((end - start) / step + 1e-9)) + 1
+
+def iter_time_chunks(start, end, step, chunk_samples=CHUNK_SAMPLES, samples=None):
+    """
+    Yields the time grid in chunks. Each time is computed as start + i * step
+    from its integer index, so rounding errors never build up along the run.
+    Given samples, the grid has exactly that many points like np.linspace
+    (step should then be (end - start) / (samples - 1)), instead of a count
+    re-derived from a rounded step.
+    """
+    total = num_samples(start, end, step) if samples is None else samples
+    for lo in range(0, total, chunk_samples):
+        times = start + step * np.arange(lo, min(lo + chunk_samples, total), dtype=np.float64)
+        if samples is not None and lo + len(times) == total and total > 1:
+            times[-1] = end # np.linspace also ends on end exactly
+        yield times
+
+def make_parameters(mass=MASS, spring_k=SPRING_K, amplitude=AMPLITUDE, phase=PHASE):
+    """A (P, 4) array of (mass, k, amplitude, phase) rows; scalars or sequences broadcast."""
+    columns = np.broadcast_arrays(*(np.atleast_1d(np.asarray(v, dtype=np.float64))
+                                    for v in (mass, spring_k, amplitude, phase)))
+    return np.stack(columns, axis=1)
+
+def load_parameters(filepath):
+    """
+    Reads parameter sets from a CSV with mass,k,amplitude,phase columns,
+    optionally followed by the ODE_COLUMNS (header optional).
+    """
+    with open(filepath, 'r', newline='') as f:
+        rows = [row for row in csv.reader(f) if row]
+    try:
+        float(rows[0][0])
+    except ValueError:
+        rows = rows[1:] # Skip the header row
+    # Rows without some of the optional columns get zeros for them
+    width = max(map(len, rows))
+    return np.array([row + ["0"] * (width - len(row)) for row in rows], dtype=np.float64)
+
+def positions(times, parameters):
+    """
+    SHO positions AMPLITUDE * cos(OMEGA * t + PHASE) for every time (rows)
+    and every parameter set (columns), as one broadcast NumPy expression.
+    """
+    mass, spring_k, amplitude, phase = parameters[:, :4].T
+    omega = np.sqrt(spring_k / mass)
+    return amplitude * np.cos(np.multiply.outer(times, omega) + phase)
+
+def iter_trajectory_chunks(parameters, start=TIME_START, end=TIME_END, step=TIME_STEP,
+                           chunk_samples=CHUNK_SAMPLES, samples=None):
+    """Yields (times, positions) chunks; positions has one column per parameter set."""
+    for times in iter_time_chunks(start, end, step, chunk_samples, samples):
+        yield times, positions(times, parameters)
+
+# 3. Numerical integration for damped, driven and nonlinear oscillators
+#    m x'' = -k x - damping x' - cubic x^3 + drive_amplitude cos(drive_omega t)
+#    Every oscillator is one entry of the state arrays x and v, so a step
+#    advances all of them with a handful of NumPy operations.
+def ode_terms(parameters):
+    """(mass, k, damping, cubic, drive_amplitude, drive_omega) columns; missing ones are zero."""
+    terms = np.zeros((len(parameters), 4))
+    extra = parameters[:, 4:4 + len(ODE_COLUMNS)]
+    terms[:, :extra.shape[1]] = extra
+    return (parameters[:, 0], parameters[:, 1]) + tuple(terms.T)
+
+def initial_state(parameters, t=0.0):
+    """Position and velocity at time t that match the analytic solution in positions()."""
+    mass, spring_k, amplitude, phase = parameters[:, :4].T
+    omega = np.sqrt(spring_k / mass)
+    angle = omega * t + phase
+    return amplitude * np.cos(angle), -amplitude * omega * np.sin(angle)
+
+def acceleration(t, x, v, terms):
+    mass, spring_k, damping, cubic, drive_amplitude, drive_omega = terms
+    force = -spring_k * x - damping * v - cubic * x ** 3 + drive_amplitude * np.cos(drive_omega * t)
+    return force / mass
+
+def rk4_step(t, x, v, dt, terms):
+    """Classic fourth-order Runge-Kutta step for all oscillators at once."""
+    a1 = acceleration(t, x, v, terms)
+    x2, v2 = x + 0.5 * dt * v, v + 0.5 * dt * a1
+    a2 = acceleration(t + 0.5 * dt, x2, v2, terms)
+    x3, v3 = x + 0.5 * dt * v2, v + 0.5 * dt * a2
+    a3 = acceleration(t + 0.5 * dt, x3, v3, terms)
+    x4, v4 = x + dt * v3, v + dt * a3
+    a4 = acceleration(t + dt, x4, v4, terms)
+    return (x + dt / 6 * (v + 2 * v2 + 2 * v3 + v4),
+            v + dt / 6 * (a1 + 2 * a2 + 2 * a3 + a4))
+
+def verlet_step(t, x, v, dt, terms):
+    """
+    Velocity Verlet (kick-drift-kick). It is symplectic for conservative
+    oscillators, so energy does not drift over long runs; with damping the
+    force is evaluated at the half-step velocity.
+    """
+    v_half = v + 0.5 * dt * acceleration(t, x, v, terms)
+    x = x + dt * v_half
+    return x, v_half + 0.5 * dt * acceleration(t + dt, x, v_half, terms)
+
+INTEGRATORS = {"rk4": rk4_step, "verlet": verlet_step}
+
+def _integrate_block(task):
+    """
+    Records n positions starting at sample index first, taking substeps
+    integration steps between samples. Returns the positions and the final
+    state so the next chunk can continue from it.
+    """
+    method, terms, x, v, first, n, start, step, substeps = task
+    advance = INTEGRATORS[method]
+    dt = step / substeps
+    out = np.empty((n, len(x)))
+    for i in range(n):
+        out[i] = x
+        base = (first + i) * substeps
+        for s in range(substeps):
+            # Step times also come from integer indices, not a running sum
+            x, v = advance(start + (base + s) * dt, x, v, dt, terms)
+    return out, x, v
+
+def iter_integrated_chunks(parameters, method="rk4", start=TIME_START, end=TIME_END, step=TIME_STEP,
+                           chunk_samples=CHUNK_SAMPLES, substeps=10, workers=1, samples=None):
+    """
+    Same chunks as iter_trajectory_chunks, but from numerically integrating
+    every oscillator. With workers > 1 the oscillators are split into one
+    block per process and each block is integrated in parallel.
+    """
+    terms = ode_terms(parameters)
+    # The first sample is at start, and the drive term uses absolute time
+    x, v = initial_state(parameters, start)
+    blocks = np.array_split(np.arange(len(parameters)), max(1, min(workers, len(parameters))))
+    states = [(x[b], v[b]) for b in blocks]
+    block_terms = [tuple(column[b] for column in terms) for b in blocks]
+
+    pool = Pool(len(blocks)) if len(blocks) > 1 else None
+    try:
+        first = 0
+        for times in iter_time_chunks(start, end, step, chunk_samples, samples):
+            tasks = [(method, block_terms[j], states[j][0], states[j][1], first, len(times),
+                      start, step, substeps) for j in range(len(blocks))]
+            results = pool.map(_integrate_block, tasks) if pool else [_integrate_block(tasks[0])]
+            states = [(x, v) for _, x, v in results]
+            first += len(times)
+            yield times, np.hstack([out for out, _, _ in results])
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+
+def check_accuracy(parameters=None, end=TIME_END, step=TIME_STEP, substeps_list=(1, 2, 4, 8, 16)):
+    """
+    Integrates the plain SHO and prints the largest deviation from the
+    analytic cos() solution; halving dt should cut the error about 16x for
+    RK4 and 4x for Verlet.
+    """
+    if parameters is None:
+        parameters = make_parameters()
+    sho = parameters[:, :4] # The analytic solution has no damping, drive or cubic term
+    exact = np.vstack([values for _, values in iter_trajectory_chunks(sho, TIME_START, end, step)])
+    print(f"{'method':>7} {'dt':>10} {'max error':>12}")
+    for method in INTEGRATORS:
+        for substeps in substeps_list:
+            approx = np.vstack([values for _, values in iter_integrated_chunks(
+                sho, method, TIME_START, end, step, substeps=substeps)])
+            print(f"{method:>7} {step / substeps:>10.5f} {np.abs(approx - exact).max():>12.3e}")
+
+def benchmark_integrators(num_oscillators=20_000, steps=500, worker_counts=(1, 2, 4)):
+    """Reports oscillator-steps per second for each method and worker count."""
+    rng = np.random.default_rng(0)
+    parameters = np.column_stack([
+        rng.uniform(0.1, 2.0, num_oscillators),  # mass
+        rng.uniform(0.5, 5.0, num_oscillators),  # k
+        rng.uniform(0.1, 2.0, num_oscillators),  # amplitude
+        rng.uniform(0, 2 * math.pi, num_oscillators),  # phase
+        rng.uniform(0, 0.2, num_oscillators),    # damping
+        rng.uniform(0, 0.5, num_oscillators),    # cubic
+        rng.uniform(0, 1.0, num_oscillators),    # drive amplitude
+        rng.uniform(0.5, 3.0, num_oscillators),  # drive omega
+    ])
+    end = (steps - 1) * TIME_STEP
+    print(f"{num_oscillators:,} oscillators, {steps} steps")
+    print(f"{'method':>7} {'workers':>7} {'seconds':>8} {'osc-steps/s':>12}")
+    for method in INTEGRATORS:
+        reference = None
+        for workers in worker_counts:
+            start_time = time.perf_counter()
+            result = np.vstack([values for _, values in iter_integrated_chunks(
+                parameters, method, TIME_START, end, TIME_STEP, substeps=1, workers=workers)])
+            elapsed = time.perf_counter() - start_time
+            # Splitting the oscillators across processes must not change any result
+            if reference is None:
+                reference = result
+            elif not np.array_equal(result, reference):
+                print("  Warning: the parallel run gave different results!")
+            print(f"{method:>7} {workers:>7} {elapsed:>8.3f} "
+                  f"{num_oscillators * steps / elapsed:>12,.0f}")
+
+# 4. Writers: CSV, or a memory-mappable .npy file
+def column_names(parameters):
+    """Header for the output: "time,position" for one oscillator, one column per set otherwise."""
+    if len(parameters) == 1:
+        return ["time", "position"]
+    return ["time"] + [f"position_m{m:g}_k{k:g}_A{a:g}_phi{p:g}"
+                       for m, k, a, p in parameters[:, :4]]
+
+def write_csv(filepath, chunks, parameters):
+    """Writes the chunks as CSV rows, one chunk at a time. Returns the number of rows."""
+    rows = 0
+    with open(filepath, 'w', newline='') as f:
         writer = csv.writer(f)
-        # Write the header row
-        writer.writerow(["time", "position"])
-        # Write all the data rows
-        writer.writerows(data_to_write)
-    print(f"Successfully generated and saved data to {FILENAME}")
-except IOError:
-    print(f"Error: Could not write to file {FILENAME}")
\ No newline at end of file
+        writer.writerow(column_names(parameters))
+        for times, values in chunks:
+            writer.writerows(np.column_stack((times, values)).tolist())
+            rows += len(times)
+    return rows
+
+def write_npy(filepath, chunks, parameters, total):
+    """
+    Writes a columnar (1 + P, total) float64 .npy file: row 0 holds the
+    times and row 1 + j the positions for parameter set j, so each column
+    can be read on its own with np.load(filepath, mmap_mode='r'). The
+    parameter sets are saved next to it as <name>_params.npy.
+    """
+    out = np.lib.format.open_memmap(filepath, mode='w+', dtype=np.float64,
+                                    shape=(1 + len(parameters), total))
+    lo = 0
+    for times, values in chunks:
+        hi = lo + len(times)
+        out[0, lo:hi] = times
+        out[1:, lo:hi] = values.T
+        lo = hi
+    out.flush()
+    del out
+    np.save(params_path(filepath), parameters)
+    return lo
+
+def params_path(filepath):
+    """Where write_npy stores the parameter sets of a .npy trajectory file."""
+    return filepath[:-len(".npy")] + "_params.npy"
+
+def generate(filepath=FILENAME, parameters=None, start=TIME_START, end=TIME_END, step=TIME_STEP,
+             chunk_samples=CHUNK_SAMPLES, method="analytic", substeps=10, workers=1, samples=None):
+    """
+    Generates the trajectories and writes them as .npy or CSV, picked by
+    file extension. method is "analytic" (the SHO formula) or one of the
+    INTEGRATORS. Pass samples for an exact sample count (see iter_time_chunks).
+    """
+    if parameters is None:
+        parameters = make_parameters()
+    if method == "analytic":
+        chunks = iter_trajectory_chunks(parameters, start, end, step, chunk_samples, samples)
+    else:
+        chunks = iter_integrated_chunks(parameters, method, start, end, step, chunk_samples,
+                                        substeps, workers, samples)
+    if filepath.endswith(".npy"):
+        total = num_samples(start, end, step) if samples is None else samples
+        return write_npy(filepath, chunks, parameters, total)
+    return write_csv(filepath, chunks, parameters)
+
+# 5. Write the data to a file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generates simple harmonic oscillator trajectories.")
+    parser.add_argument("--out", default=FILENAME, help="output file (.csv or .npy)")
+    parser.add_argument("--start", type=float, default=TIME_START, help="first time (s)")
+    parser.add_argument("--end", type=float, default=TIME_END, help="last time (s)")
+    parser.add_argument("--step", type=float, default=TIME_STEP, help="time step (s)")
+    parser.add_argument("--samples", type=int, help="number of evenly spaced samples (overrides --step)")
+    parser.add_argument("--sweep", help="CSV of mass,k,amplitude,phase[,damping,cubic,drive_amplitude,"
+                                        "drive_omega] rows, one oscillator per row")
+    parser.add_argument("--chunk", type=int, default=CHUNK_SAMPLES, help="samples per chunk")
+    parser.add_argument("--method", choices=["analytic"] + list(INTEGRATORS), default="analytic",
+                        help="closed-form SHO or numerical integration (uses the ODE columns)")
+    parser.add_argument("--substeps", type=int, default=10, help="integration steps per sample")
+    parser.add_argument("--workers", type=int, default=1, help="processes for numerical integration")
+    parser.add_argument("--check", action="store_true", help="compare the integrators with the SHO formula")
+    parser.add_argument("--bench", action="store_true", help="benchmark the integrators")
+    options = parser.parse_args()
+
+    if options.check:
+        check_accuracy()
+    if options.bench:
+        benchmark_integrators()
+    if options.check or options.bench:
+        raise SystemExit
+
+    step = options.step
+    if options.samples:
+        # Same grid as np.linspace(start, end, samples)
+        step = (options.end - options.start) / max(options.samples - 1, 1)
+    parameters = load_parameters(options.sweep) if options.sweep else make_parameters()
+
+    try:
+        generate(options.out, parameters, options.start, options.end, step, options.chunk,
+                 options.method, options.substeps, options.workers, options.samples)
+        print(f"Successfully generated and saved data to {options.out}")
+    except IOError:
+        print(f"Error: Could not write to file {options.out}")
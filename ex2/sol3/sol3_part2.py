@@ -1,9 +1,17 @@
 # plot_data.py
+import argparse
+import os
+import time
+
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 
 FILENAME = "oscillator_data.csv"
 
+# Rows read per chunk in the downsampled mode
+CHUNK_ROWS = 1 << 20
+
 def plot_oscillator_data():
     """Reads oscillator data from a CSV and plots it."""
     try:
@@ -33,6 +41,123 @@ def plot_oscillator_data():
     except Exception as e:
         print(f"An error occurred: {e}")
 
+# --- Downsampled, headless plotting for very large files ---
+
+def iter_data_chunks(filepath, chunk_rows=CHUNK_ROWS):
+    """
+    Yields (times, positions) chunks from a CSV or a columnar .npy file
+    written by sol3_part1.py; positions has one column per series.
+    """
+    if filepath.endswith(".npy"):
+        data = np.load(filepath, mmap_mode='r')
+        for lo in range(0, data.shape[1], chunk_rows):
+            block = np.asarray(data[:, lo:lo + chunk_rows])
+            yield block[0], block[1:].T
+    else:
+        for frame in pd.read_csv(filepath, chunksize=chunk_rows):
+            values = frame.to_numpy(dtype=np.float64)
+            yield values[:, 0], values[:, 1:]
+
+def read_series_info(filepath):
+    """Returns (series names, first time, last time) without reading the whole file."""
+    if filepath.endswith(".npy"):
+        data = np.load(filepath, mmap_mode='r')
+        names = [f"position_{j}" for j in range(data.shape[0] - 1)]
+        return names, float(data[0, 0]), float(data[0, -1])
+
+    with open(filepath, 'rb') as f:
+        names = f.readline().decode().strip().split(",")[1:]
+        first_time = float(f.readline().split(b",")[0])
+        # The last row is found by reading backwards from the end of the file
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        tail_size = 4096
+        while True:
+            f.seek(max(0, size - tail_size))
+            lines = f.read().split()
+            if len(lines) > 1 or tail_size >= size:
+                break
+            tail_size *= 2
+        last_time = float(lines[-1].split(b",")[0])
+    return names, first_time, last_time
+
+def downsample_minmax(chunks, first_time, last_time, num_buckets):
+    """
+    Min/max per pixel column: the time axis is cut into num_buckets equal
+    buckets and only the lowest and highest value of each series per
+    bucket is kept. Drawing a vertical segment between them covers exactly
+    the pixels the full line would, so peaks are never lost.
+    Returns (bucket centers, lows, highs, samples seen).
+    """
+    lows = highs = None
+    samples = 0
+    scale = num_buckets / max(last_time - first_time, 1e-300)
+    for times, values in chunks:
+        if lows is None:
+            lows = np.full((num_buckets, values.shape[1]), np.inf)
+            highs = np.full((num_buckets, values.shape[1]), -np.inf)
+        buckets = np.clip(((times - first_time) * scale).astype(np.intp), 0, num_buckets - 1)
+        np.minimum.at(lows, buckets, values)
+        np.maximum.at(highs, buckets, values)
+        samples += len(times)
+
+    centers = first_time + (np.arange(num_buckets) + 0.5) / scale
+    if lows is None:
+        return centers, np.empty((num_buckets, 0)), np.empty((num_buckets, 0)), 0
+    return centers, lows, highs, samples
+
+def plot_downsampled(filepath=FILENAME, out="oscillator_plot.png", width_px=1000, height_px=600,
+                     dpi=100, chunk_rows=CHUNK_ROWS):
+    """
+    Plots a file of any size straight to an image (PNG, SVG, ... by
+    extension) with the non-interactive Agg backend. The file is read in
+    chunks and reduced to two points per pixel column, so the drawing cost
+    depends on width_px, not on the number of samples.
+    """
+    plt.switch_backend("Agg")
+    names, first_time, last_time = read_series_info(filepath)
+    centers, lows, highs, samples = downsample_minmax(
+        iter_data_chunks(filepath, chunk_rows), first_time, last_time, width_px)
+
+    fig = plt.figure(figsize=(width_px / dpi, height_px / dpi), dpi=dpi)
+    for j in range(lows.shape[1]):
+        filled = np.isfinite(lows[:, j])
+        x = np.repeat(centers[filled], 2)
+        y = np.column_stack((lows[filled, j], highs[filled, j])).ravel()
+        plt.plot(x, y, linestyle='-', linewidth=1,
+                 label=names[j] if lows.shape[1] > 1 and j < len(names) else None)
+
+    plt.title("Simple Harmonic Oscillator Motion")
+    plt.xlabel("Time (s)")
+    plt.ylabel("Position (m)")
+    plt.grid(True)
+    if 1 < lows.shape[1] <= 10:
+        plt.legend(fontsize="small")
+
+    fig.savefig(out, dpi=dpi)
+    plt.close(fig)
+    return samples
+
 # Main execution
 if __name__ == "__main__":
-    plot_oscillator_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Plots oscillator data from a CSV or .npy file.")
+    parser.add_argument("--file", default=FILENAME, help="data file written by sol3_part1.py")
+    parser.add_argument("--out", help="render a downsampled plot to this image (.png, .svg, ...) "
+                                      "instead of opening a window")
+    parser.add_argument("--width", type=int, default=1000, help="image width in pixels")
+    parser.add_argument("--height", type=int, default=600, help="image height in pixels")
+    parser.add_argument("--chunk", type=int, default=CHUNK_ROWS, help="rows read per chunk")
+    options = parser.parse_args()
+
+    if options.out:
+        try:
+            start = time.perf_counter()
+            samples = plot_downsampled(options.file, options.out, options.width, options.height,
+                                       chunk_rows=options.chunk)
+            print(f"Plotted {samples:,} samples to {options.out} in {time.perf_counter() - start:.2f} s")
+        except FileNotFoundError:
+            print(f"Error: {options.file} not found.")
+            print("Please run generate_data.py first to create the data file.")
+    else:
+        FILENAME = options.file
+        plot_oscillator_data()
\ No newline at end of file
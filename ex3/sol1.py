@@ -1,6 +1,13 @@
 # solution_q1.py
 
+import argparse
 import sys
+import time
+
+import numpy as np
+
+# Values read and converted per block in the batch CLI mode
+BATCH_LINES = 1 << 18
 
 def setup_conversions():
     """Sets up the data structure for all unit conversions."""
@@ -36,6 +43,165 @@ def convert_by_factor(value, unit_from, unit_to, units_dict):
     final_value = value_in_base_unit * units_dict[unit_to]
     return final_value
 
+# --- Batch conversion engine ---
+
+class ConversionMatrix:
+    """
+    Every supported conversion as one affine map, result = value * scale + offset,
+    precomputed from setup_conversions() for all unit pairs. Factor units get
+    offset 0; temperature units are read off the formulas, which are affine.
+    Pairs from different categories are NaN and rejected.
+    """
+
+    def __init__(self, conversions=None):
+        if conversions is None:
+            conversions = setup_conversions()
+        self.units = []
+        self.categories = []
+        pairs = {} # (from, to) -> (scale, offset)
+
+        for category in conversions.values():
+            if category["units"]:
+                units_dict = category["units"]
+                for unit_from, factor_from in units_dict.items():
+                    for unit_to, factor_to in units_dict.items():
+                        pairs[unit_from, unit_to] = (factor_to / factor_from, 0.0)
+                names = list(units_dict)
+            else:
+                names = []
+                for formula_name, formula in category["formulas"].items():
+                    unit_from, unit_to = formula_name.split("_to_")
+                    offset = formula(0.0)
+                    # A large power of two keeps the slope free of rounding from the offset
+                    scale = (formula(2.0 ** 30) - offset) / 2.0 ** 30
+                    pairs[unit_from, unit_to] = (scale, offset)
+                    for unit in (unit_from, unit_to):
+                        if unit not in names:
+                            names.append(unit)
+                            pairs[unit, unit] = (1.0, 0.0)
+            self.units.extend(names)
+            self.categories.extend([category["name"]] * len(names))
+
+        self.index = {unit: i for i, unit in enumerate(self.units)}
+        size = len(self.units)
+        self.scale = np.full((size, size), np.nan)
+        self.offset = np.full((size, size), np.nan)
+        for (unit_from, unit_to), (scale, offset) in pairs.items():
+            self.scale[self.index[unit_from], self.index[unit_to]] = scale
+            self.offset[self.index[unit_from], self.index[unit_to]] = offset
+
+    def unit_codes(self, units):
+        """Turns unit names into row/column indices of the matrices."""
+        try:
+            return np.array([self.index[unit.lower()] for unit in units], dtype=np.intp)
+        except KeyError as e:
+            raise ValueError(f"Unknown unit: {e.args[0]}") from None
+
+    def coefficients(self, unit_from, unit_to):
+        """(scale, offset) for one unit pair; raises ValueError if it can't be converted."""
+        i, j = self.unit_codes([unit_from, unit_to])
+        if np.isnan(self.scale[i, j]):
+            raise ValueError(f"Cannot convert {self.categories[i]} ({unit_from}) "
+                             f"to {self.categories[j]} ({unit_to})")
+        return self.scale[i, j], self.offset[i, j]
+
+    def convert(self, values, unit_from, unit_to):
+        """Converts an array of values from one unit to another in a single vectorized pass."""
+        scale, offset = self.coefficients(unit_from, unit_to)
+        result = np.multiply(values, scale, dtype=np.float64)
+        if offset:
+            result += offset
+        return result
+
+    def convert_pairs(self, values, units_from, units_to):
+        """
+        Converts values[i] from units_from[i] to units_to[i]. Units may be
+        names or codes from unit_codes(); incompatible pairs give NaN.
+        """
+        codes_from = np.asarray(units_from)
+        codes_to = np.asarray(units_to)
+        if codes_from.dtype.kind in "UO":
+            codes_from = self.unit_codes(codes_from)
+        if codes_to.dtype.kind in "UO":
+            codes_to = self.unit_codes(codes_to)
+        values = np.asarray(values, dtype=np.float64)
+        return values * self.scale[codes_from, codes_to] + self.offset[codes_from, codes_to]
+
+def _iter_line_blocks(stream, block_lines=BATCH_LINES):
+    """Yields lists of up to block_lines lines from a text stream."""
+    block = []
+    for line in stream:
+        block.append(line)
+        if len(block) >= block_lines:
+            yield block
+            block = []
+    if block:
+        yield block
+
+def convert_stream(matrix, infile, outfile, unit_from=None, unit_to=None):
+    """
+    Batch CLI mode. With unit_from/unit_to every whitespace-separated token
+    is a value; otherwise each line is "value from_unit to_unit". Writes one
+    result per line and returns how many values were converted.
+    """
+    count = 0
+    for block in _iter_line_blocks(infile):
+        if unit_from is not None:
+            values = np.array(" ".join(block).split(), dtype=np.float64)
+            result = matrix.convert(values, unit_from, unit_to)
+        else:
+            fields = [line.split() for line in block if line.strip()]
+            if not fields:
+                continue
+            if any(len(f) != 3 for f in fields):
+                raise ValueError("Each line must be: value from_unit to_unit")
+            values, units_from, units_to = zip(*fields)
+            codes_from, codes_to = matrix.unit_codes(units_from), matrix.unit_codes(units_to)
+            incompatible = np.flatnonzero(np.isnan(matrix.scale[codes_from, codes_to]))
+            if len(incompatible):
+                # Raises the same error as a single conversion would
+                i = incompatible[0]
+                matrix.coefficients(units_from[i], units_to[i])
+            result = matrix.convert_pairs(np.array(values, dtype=np.float64), codes_from, codes_to)
+        if len(result):
+            outfile.write("\n".join(map(str, result.tolist())) + "\n")
+        count += len(result)
+    return count
+
+def benchmark(count=10_000_000):
+    """Compares the vectorized engine with convert_by_factor called per value."""
+    matrix = ConversionMatrix()
+    units_dict = setup_conversions()["1"]["units"]
+    values = np.random.default_rng(0).uniform(-1000, 1000, count)
+
+    loop_count = min(count, 1_000_000)
+    sample = values[:loop_count].tolist()
+    start = time.perf_counter()
+    expected = [convert_by_factor(v, "ft", "m", units_dict) for v in sample]
+    loop_rate = loop_count / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    result = matrix.convert(values, "ft", "m")
+    vector_rate = count / (time.perf_counter() - start)
+    if not np.allclose(result[:loop_count], expected, rtol=1e-12):
+        print("Warning: the vectorized results differ from convert_by_factor!")
+
+    codes = matrix.unit_codes(["m", "ft", "km", "mile"])
+    rng = np.random.default_rng(1)
+    codes_from, codes_to = rng.choice(codes, count), rng.choice(codes, count)
+    start = time.perf_counter()
+    matrix.convert_pairs(values, codes_from, codes_to)
+    pairs_rate = count / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    matrix.convert(values, "c", "f")
+    temperature_rate = count / (time.perf_counter() - start)
+
+    print(f"convert_by_factor loop:   {loop_rate:>14,.0f} conversions/s")
+    print(f"vectorized, one pair:     {vector_rate:>14,.0f} conversions/s")
+    print(f"vectorized, mixed pairs:  {pairs_rate:>14,.0f} conversions/s")
+    print(f"vectorized, temperature:  {temperature_rate:>14,.0f} conversions/s")
+
 def main():
     """Main loop for the unit converter application."""
     conversions = setup_conversions()
@@ -92,4 +258,36 @@ def main():
             print(f"An error occurred: {e}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # Usage:
+    #   python sol1.py                                 -> interactive converter
+    #   python sol1.py --from ft --to m [FILE]         -> convert every value in FILE (or stdin)
+    #   python sol1.py --pairs [FILE]                  -> lines of "value from_unit to_unit"
+    #   python sol1.py --bench                         -> throughput benchmark
+    if len(sys.argv) == 1:
+        main()
+        sys.exit()
+
+    parser = argparse.ArgumentParser(description="Batch unit converter.")
+    parser.add_argument("file", nargs="?", help="input file (default: stdin)")
+    parser.add_argument("--from", dest="unit_from", help="unit of every input value")
+    parser.add_argument("--to", dest="unit_to", help="unit to convert to")
+    parser.add_argument("--pairs", action="store_true", help='each line is "value from_unit to_unit"')
+    parser.add_argument("--bench", action="store_true", help="run the throughput benchmark")
+    options = parser.parse_args()
+
+    if options.bench:
+        benchmark()
+        sys.exit()
+    if not options.pairs and not (options.unit_from and options.unit_to):
+        parser.error("give --from and --to, or --pairs")
+
+    infile = open(options.file, 'r') if options.file else sys.stdin
+    try:
+        convert_stream(ConversionMatrix(), infile, sys.stdout,
+                       None if options.pairs else options.unit_from,
+                       None if options.pairs else options.unit_to)
+    except ValueError as e:
+        sys.exit(f"Error: {e}")
+    finally:
+        if infile is not sys.stdin:
+            infile.close()
\ No newline at end of file
@@ -1,9 +1,120 @@
 # solution_q2.py
 
+import argparse
+import io
+import sys
+import time
 import tkinter as tk
 from tkinter import ttk
 import numpy as np
 
+# --- Solver core (no GUI) ---
+
+def solve_quadratics(a, b, c):
+    """
+    Solves a*x² + b*x + c = 0 for whole arrays of coefficients at once and
+    returns two complex arrays (root1, root2). Real roots use the stable
+    form q = -(b + sign(b)·√disc) / 2, x1 = q/a, x2 = c/q, so the smaller
+    root is never the difference of two nearly equal numbers. Complex
+    roots come as a conjugate pair with the positive imaginary part first,
+    and a double root is returned twice. Equations with a == 0 give NaN.
+    """
+    a, b, c = np.broadcast_arrays(*(np.asarray(v, dtype=np.float64) for v in (a, b, c)))
+    disc = b * b - 4 * a * c
+    real_roots = disc >= 0
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sqrt_disc = np.sqrt(np.abs(disc))
+        # copysign keeps b = 0 well defined (sign(0) would drop the square root)
+        q = -0.5 * (b + np.copysign(sqrt_disc, b))
+        root1_real = np.where(real_roots, q / a, -b / (2 * a))
+        # q is zero only when b and c both are, and then both roots are zero
+        root2_real = np.where(real_roots, np.where(q != 0, c / q, 0.0), root1_real)
+        imag = np.where(real_roots, 0.0, np.abs(sqrt_disc / (2 * a)))
+
+    # Adding 0.0 turns -0.0 into 0.0; a == 0 is not a quadratic
+    degenerate = a == 0
+    root1 = np.where(degenerate, np.nan, root1_real + 0.0 + 1j * imag)
+    root2 = np.where(degenerate, np.nan, root2_real + 0.0 - 1j * imag)
+    return root1, root2
+
+def is_double_root(a, b, c):
+    """True where the two roots coincide (zero discriminant)."""
+    a, b, c = (np.asarray(v, dtype=np.float64) for v in (a, b, c))
+    return (b * b - 4 * a * c == 0) & (a != 0)
+
+def format_root(root):
+    """Formats a root like the GUI: a plain number when it is real."""
+    if root.imag == 0:
+        return f"{root.real:.4f}"
+    return f"{root:.4f}"
+
+def _check_line_lengths(text):
+    """Raises ValueError naming the first non-blank line that isn't three fields."""
+    for number, line in enumerate(text.splitlines(), 1):
+        if line.strip() and len(line.split()) != 3:
+            raise ValueError(f"Line {number} must contain three coefficients: {line.strip()!r}")
+
+def solve_stream(infile, outfile):
+    """
+    Batch mode: every line is one equation "a b c". Writes "root1 root2"
+    per equation and returns how many were solved.
+    """
+    text = infile.read()
+    if not text.strip():
+        return 0
+    # loadtxt parses line by line, so a line with a missing or extra
+    # coefficient is an error instead of shifting every later equation
+    try:
+        coefficients = np.loadtxt(io.StringIO(text), ndmin=2)
+    except ValueError:
+        _check_line_lengths(text)
+        raise
+    if coefficients.shape[1] != 3:
+        _check_line_lengths(text)
+    a, b, c = coefficients.T
+    root1, root2 = solve_quadratics(a, b, c)
+    real = (root1.imag == 0) & (root2.imag == 0)
+    lines = [f"{r1.real!r} {r2.real!r}" if is_real else f"{r1!r} {r2!r}"
+             for r1, r2, is_real in zip(root1.tolist(), root2.tolist(), real.tolist())]
+    if lines:
+        outfile.write("\n".join(lines) + "\n")
+    return len(lines)
+
+def benchmark(count=1_000_000, roots_limit=20_000):
+    """
+    Times solve_quadratics on count random equations against np.roots. np.roots
+    runs one eigensolve per equation, so it is timed on roots_limit equations
+    and scaled up.
+    """
+    rng = np.random.default_rng(0)
+    a, b, c = rng.uniform(-10, 10, (3, count))
+
+    start = time.perf_counter()
+    root1, root2 = solve_quadratics(a, b, c)
+    vector_time = time.perf_counter() - start
+
+    sample = min(count, roots_limit)
+    start = time.perf_counter()
+    expected = [np.roots([a[i], b[i], c[i]]) for i in range(sample)]
+    roots_time = (time.perf_counter() - start) * count / sample
+
+    # Both solvers must find the same pair of roots (in any order)
+    ours = np.sort_complex(np.column_stack((root1[:sample], root2[:sample])))
+    theirs = np.sort_complex(np.array(expected, dtype=np.complex128))
+    if not np.allclose(ours, theirs, rtol=1e-9, atol=1e-12):
+        print("Warning: results differ from np.roots!")
+
+    print(f"{count:,} equations")
+    print(f"solve_quadratics: {vector_time:8.3f} s ({count / vector_time:>14,.0f} equations/s)")
+    print(f"np.roots:         {roots_time:8.3f} s ({count / roots_time:>14,.0f} equations/s, "
+          f"estimated from {sample:,})")
+
+    # Cancellation: the small root of x² + 1e8·x + 1 is about -1e-8
+    textbook = (-1e8 + np.sqrt(1e16 - 4)) / 2
+    stable = solve_quadratics(1.0, 1e8, 1.0)[1].real
+    print(f"Small root of x² + 1e8x + 1: textbook formula {textbook:.10e}, stable {stable:.10e}")
+
 class QuadraticSolverApp:
     def __init__(self, root):
         self.root = root
@@ -48,17 +159,15 @@ class QuadraticSolverApp:
                 self.result_var.set("Error: 'a' cannot be zero.")
                 return
 
-            # Use numpy.roots to find the roots
-            coefficients = [a, b, c]
-            roots = np.roots(coefficients)
+            # Use the shared solver core for this one equation
+            root1, root2 = solve_quadratics(a, b, c)
+            root1, root2 = complex(root1), complex(root2)
             
             # Format the result string
-            if len(roots) == 1:
-                result_str = f"Double Root: {roots[0]:.4f}"
+            if is_double_root(a, b, c):
+                result_str = f"Double Root: {format_root(root1)}"
             else:
-                root1_str = f"{roots[0]:.4f}" if np.isreal(roots[0]) else f"{roots[0]:.4f}"
-                root2_str = f"{roots[1]:.4f}" if np.isreal(roots[1]) else f"{roots[1]:.4f}"
-                result_str = f"Roots: {root1_str}, {root2_str}"
+                result_str = f"Roots: {format_root(root1)}, {format_root(root2)}"
 
             self.result_var.set(result_str)
 
@@ -68,6 +177,31 @@ class QuadraticSolverApp:
             self.result_var.set(f"An error occurred: {e}")
 
 if __name__ == "__main__":
+    # Usage:
+    #   python sol2.py                    -> the Tk GUI
+    #   python sol2.py --batch [FILE]     -> solve "a b c" lines from FILE or stdin
+    #   python sol2.py --bench [N]        -> compare with np.roots on N equations
+    if len(sys.argv) > 1:
+        parser = argparse.ArgumentParser(description="Batch quadratic equation solver.")
+        parser.add_argument("--batch", nargs="?", const="-", metavar="FILE",
+                            help='solve one "a b c" equation per line (default: stdin)')
+        parser.add_argument("--bench", nargs="?", const=1_000_000, type=int, metavar="N",
+                            help="benchmark against np.roots")
+        options = parser.parse_args()
+
+        if options.bench:
+            benchmark(options.bench)
+        elif options.batch:
+            infile = sys.stdin if options.batch == "-" else open(options.batch, 'r')
+            try:
+                solve_stream(infile, sys.stdout)
+            except ValueError as e:
+                sys.exit(f"Error: {e}")
+            finally:
+                if infile is not sys.stdin:
+                    infile.close()
+        sys.exit()
+
     root = tk.Tk()
     app = QuadraticSolverApp(root)
     root.mainloop()
\ No newline at end of file
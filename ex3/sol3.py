@@ -2,34 +2,103 @@
 
 import numpy as np
 import scipy.interpolate as interp
+import scipy.spatial as spatial
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 import heapq
+import os
+import shutil
+import subprocess
+import sys
+import time
+from collections import deque
+from multiprocessing import Pool
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from PIL import Image
 
 # --- Part 1: Interpolation and Path Reconstruction ---
 
+# Rows reconstructed per window when streaming a long track
+WINDOW_SIZE = 1 << 16
+# Known points kept on each side of a window. A cubic spline's dependence on
+# far-away points shrinks by about 3.7x per knot, so 64 knots make the
+# windowed result equal to the whole-track spline to machine precision.
+WINDOW_CONTEXT = 64
+
+def _as_float_path(path):
+    """A float array of points; None becomes NaN, which marks a missing point."""
+    return np.asarray(path, dtype=float)
+
+def _interpolate(known_indices, known_points, query_indices):
+    """
+    The cubic interp1d of the original code, for all coordinates in one
+    spline fit: interp1d(kind='cubic') is a not-a-knot interpolating spline.
+    """
+    spline = interp.make_interp_spline(known_indices, known_points, k=3, axis=0)
+    return spline(query_indices, extrapolate=True)
+
 def reconstruct_path(incomplete_path):
     """Interpolates missing points in a path."""
-    # Convert path to a numpy array for easier manipulation
-    path_array = np.array(incomplete_path, dtype=object)
-    
-    # Get indices of known points
-    known_indices = np.where(path_array[:, 1] != None)[0]
-    
-    # Separate x and y coordinates
-    x_coords = np.array([p[0] for p in path_array[known_indices]], dtype=float)
-    y_coords = np.array([p[1] for p in path_array[known_indices]], dtype=float)
-    
-    # Create interpolation functions
-    interp_x = interp.interp1d(known_indices, x_coords, kind='cubic', fill_value="extrapolate")
-    interp_y = interp.interp1d(known_indices, y_coords, kind='cubic', fill_value="extrapolate")
-    
+    # Points with any NaN (or None) coordinate are the ones to fill in
+    path_array = _as_float_path(incomplete_path)
+    known_indices = np.flatnonzero(~np.isnan(path_array).any(axis=1))
+
     # Generate the full path
-    all_indices = np.arange(len(incomplete_path))
-    full_path_x = interp_x(all_indices)
-    full_path_y = interp_y(all_indices)
-    
-    return np.column_stack((full_path_x, full_path_y))
+    all_indices = np.arange(len(path_array))
+    return _interpolate(known_indices, path_array[known_indices], all_indices)
+
+def reconstruct_paths(tracks):
+    """
+    Reconstructs many tracks in one call. tracks is a (T, N, D) array or a
+    list of (N_i, D) tracks. Tracks with the same gaps share a single spline
+    fit that covers all of their coordinates at once.
+    """
+    if isinstance(tracks, np.ndarray) and tracks.ndim == 3:
+        tracks = tracks.astype(float, copy=False)
+        known = ~np.isnan(tracks).any(axis=2)
+        result = np.empty_like(tracks)
+        groups = {}
+        for t, mask in enumerate(known):
+            groups.setdefault(mask.tobytes(), []).append(t)
+
+        all_indices = np.arange(tracks.shape[1])
+        for members in groups.values():
+            known_indices = np.flatnonzero(known[members[0]])
+            # (known points, tracks, coordinates) -> one multi-column fit
+            points = tracks[members][:, known_indices].transpose(1, 0, 2)
+            result[members] = _interpolate(known_indices, points, all_indices).transpose(1, 0, 2)
+        return result
+
+    return [reconstruct_path(track) for track in tracks]
+
+def iter_reconstruct_windows(incomplete_path, window=WINDOW_SIZE, context=WINDOW_CONTEXT):
+    """
+    Streams the reconstruction of a very long track, window rows at a time.
+    incomplete_path can be anything sliceable, e.g. an np.load(...,
+    mmap_mode='r') array, so only one window (plus context) is in memory.
+    Each window is fitted with context known points on both sides and
+    yields (start_index, points).
+    """
+    length = len(incomplete_path)
+    for lo in range(0, length, window):
+        hi = min(lo + window, length)
+
+        # Widen the slice until it has enough known points on both sides
+        pad = 2 * context
+        while True:
+            a, b = max(0, lo - pad), min(length, hi + pad)
+            chunk = _as_float_path(incomplete_path[a:b])
+            known_indices = np.flatnonzero(~np.isnan(chunk).any(axis=1))
+            before = np.count_nonzero(known_indices < lo - a)
+            after = np.count_nonzero(known_indices >= hi - a)
+            if (before >= context or a == 0) and (after >= context or b == length):
+                break
+            pad *= 2
+
+        points = _interpolate(known_indices + a, chunk[known_indices], np.arange(lo, hi))
+        yield lo, points
 
 # --- Part 3: Dijkstra's Algorithm for Path Optimization ---
 
@@ -78,9 +147,377 @@ def dijkstra(nodes, start_node_idx, end_node_idx):
     
     return path[::-1] # Return the reversed path
 
+# Largest graph for which dijkstra_dense precomputes the full distance matrix (256 MB)
+DENSE_MATRIX_MAX_NODES = 5792
+
+def pairwise_distances(nodes):
+    """All point-to-point distances, computed with the same operations as euclidean_distance."""
+    xs, ys = nodes[:, 0], nodes[:, 1]
+    return np.sqrt((xs[:, None] - xs[None, :])**2 + (ys[:, None] - ys[None, :])**2)
+
+def dijkstra_dense(nodes, start_node_idx, end_node_idx, use_matrix=None):
+    """
+    Dijkstra for a complete graph without a heap: each round scans the
+    tentative distances for the closest unvisited node and relaxes all
+    edges out of it with one vectorized row of distances, O(V^2) in total.
+    Ties are settled by lowest index, like the heap's (distance, index)
+    order, so the path is identical to dijkstra()'s. The distance matrix
+    is precomputed when it fits in DENSE_MATRIX_MAX_NODES, else each row
+    is computed when its node is visited.
+    """
+    nodes = np.asarray(nodes, dtype=float)
+    num_nodes = len(nodes)
+    if use_matrix is None:
+        use_matrix = num_nodes <= DENSE_MATRIX_MAX_NODES
+    matrix = pairwise_distances(nodes) if use_matrix else None
+    xs, ys = nodes[:, 0], nodes[:, 1]
+
+    distances = np.full(num_nodes, np.inf)
+    distances[start_node_idx] = 0
+    previous_nodes = np.full(num_nodes, -1)
+    # Visited nodes are hidden from the scan by an infinite key
+    unvisited = np.zeros(num_nodes)
+
+    while True:
+        current_idx = int(np.argmin(distances + unvisited))
+        if unvisited[current_idx] or np.isinf(distances[current_idx]) or current_idx == end_node_idx:
+            break # Reached the destination (or nothing left to reach)
+        unvisited[current_idx] = np.inf
+
+        if matrix is not None:
+            weights = matrix[current_idx]
+        else:
+            weights = np.sqrt((xs[current_idx] - xs)**2 + (ys[current_idx] - ys)**2)
+        new_dist = distances[current_idx] + weights
+        better = new_dist < distances
+        better[current_idx] = False
+        distances[better] = new_dist[better]
+        previous_nodes[better] = current_idx
+
+    # Reconstruct the path from end to start
+    path = []
+    current = end_node_idx
+    while current != -1:
+        path.append(current)
+        current = int(previous_nodes[current])
+
+    return path[::-1] # Return the reversed path
+
+def benchmark_dijkstra(sizes=(100, 300, 1000, 3000, 10000), heap_limit=1000):
+    """Times the heap Dijkstra and both dense variants on random points."""
+    rng = np.random.default_rng(0)
+    print(f"{'V':>6} {'heap s':>9} {'matrix s':>9} {'rows s':>9}")
+    for size in sizes:
+        # Points along a noisy curve, like a reconstructed track
+        t = np.sort(rng.uniform(0, 10, size))
+        nodes = np.column_stack((t, np.sin(t) + rng.normal(0, 0.05, size)))
+        end = size - 1
+
+        timings = []
+        paths = []
+        variants = [lambda: dijkstra(nodes, 0, end),
+                    lambda: dijkstra_dense(nodes, 0, end, use_matrix=True),
+                    lambda: dijkstra_dense(nodes, 0, end, use_matrix=False)]
+        for i, run in enumerate(variants):
+            if (i == 0 and size > heap_limit) or (i == 1 and size > DENSE_MATRIX_MAX_NODES):
+                timings.append(None)
+                continue
+            start = time.perf_counter()
+            paths.append(run())
+            timings.append(time.perf_counter() - start)
+
+        if any(path != paths[0] for path in paths):
+            print("  Warning: the variants found different paths!")
+        print(f"{size:>6} " + " ".join(f"{'-':>9}" if t is None else f"{t:>9.3f}" for t in timings))
+
+# --- Sparse neighbor graph with A* for large point sets ---
+
+class NeighborGraph:
+    """
+    Connects each point only to nearby points instead of to every other
+    point. Edges are found with a k-d tree and stored as CSR arrays
+    (neighbors of i are indices[indptr[i]:indptr[i + 1]]), so memory grows
+    with the number of edges, not with V^2. Edges are two-way.
+    """
+
+    def __init__(self, points, pairs):
+        self.points = points
+        num_nodes = len(points)
+        rows, cols = (np.asarray(side, dtype=np.int64) for side in pairs)
+        # Keep each edge once in both directions (a kNN edge may be found from
+        # either end). The CSR arrays are built by hand rather than through a
+        # sparse matrix, which would drop the zero-length edges between
+        # coincident points (e.g. a particle standing still).
+        keys = np.unique(np.minimum(rows, cols) * num_nodes + np.maximum(rows, cols))
+        lo, hi = np.divmod(keys[keys // num_nodes != keys % num_nodes], num_nodes)
+        # One sort of src * V + dst keys puts the edges in CSR order
+        src, dst = np.divmod(np.sort(np.r_[lo * num_nodes + hi, hi * num_nodes + lo]), num_nodes)
+        index_type = np.int32 if num_nodes < 2**31 else np.int64
+        self.indptr = np.r_[0, np.cumsum(np.bincount(src, minlength=num_nodes))].astype(index_type)
+        self.indices = dst.astype(index_type)
+        self.weights = euclidean_distance(points[src].T, points[dst].T)
+
+    @classmethod
+    def knn(cls, points, k=8):
+        """Links every point to its k nearest neighbors."""
+        points = np.asarray(points, dtype=float)[:, :2]
+        k = min(k, len(points) - 1)
+        if k < 1:
+            # No other point to link to (and query(k=1) would return 1-D arrays)
+            return cls(points, ((), ()))
+        _, neighbors = spatial.cKDTree(points).query(points, k=k + 1)
+        # Coincident points tie at distance 0, so a point need not come back
+        # first (or at all); drop it wherever it is, else the farthest match
+        keep = neighbors != np.arange(len(points))[:, None]
+        keep[keep.all(axis=1), -1] = False
+        rows = np.repeat(np.arange(len(points)), k)
+        return cls(points, (rows, neighbors[keep]))
+
+    @classmethod
+    def radius(cls, points, r):
+        """Links every pair of points closer than r."""
+        points = np.asarray(points, dtype=float)[:, :2]
+        pairs = spatial.cKDTree(points).query_pairs(r, output_type='ndarray')
+        return cls(points, (pairs[:, 0], pairs[:, 1]))
+
+    @property
+    def num_edges(self):
+        return len(self.indices)
+
+    @property
+    def nbytes(self):
+        return self.indptr.nbytes + self.indices.nbytes + self.weights.nbytes
+
+    def astar(self, start_node_idx, end_node_idx, use_heuristic=True):
+        """
+        A* from start to end, using the straight-line distance to the end
+        (euclidean_distance) as the heuristic. It never overestimates, so
+        the path is a shortest one in this graph. use_heuristic=False gives
+        plain Dijkstra. Returns the list of node indices, or None.
+        """
+        num_nodes = len(self.points)
+        goal = self.points[end_node_idx]
+        if use_heuristic:
+            # euclidean_distance works on whole coordinate arrays at once
+            heuristic = euclidean_distance(self.points.T, goal)
+        else:
+            heuristic = np.zeros(num_nodes)
+        distances = np.full(num_nodes, np.inf)
+        distances[start_node_idx] = 0
+        previous_nodes = np.full(num_nodes, -1)
+        closed = np.zeros(num_nodes, dtype=bool)
+
+        # Priority queue stores (distance + heuristic, node_index)
+        pq = [(heuristic[start_node_idx], start_node_idx)]
+        while pq:
+            _, current_idx = heapq.heappop(pq)
+            if closed[current_idx]:
+                continue
+            if current_idx == end_node_idx:
+                break
+            closed[current_idx] = True
+
+            lo, hi = self.indptr[current_idx], self.indptr[current_idx + 1]
+            neighbors = self.indices[lo:hi]
+            new_dist = distances[current_idx] + self.weights[lo:hi]
+            better = new_dist < distances[neighbors]
+            for neighbor_idx, dist in zip(neighbors[better].tolist(), new_dist[better].tolist()):
+                distances[neighbor_idx] = dist
+                previous_nodes[neighbor_idx] = current_idx
+                heapq.heappush(pq, (dist + heuristic[neighbor_idx], neighbor_idx))
+
+        if np.isinf(distances[end_node_idx]):
+            return None
+        path = []
+        current = end_node_idx
+        while current != -1:
+            path.append(current)
+            current = int(previous_nodes[current])
+        return path[::-1]
+
+    def path_length(self, path):
+        """Total Euclidean length of a path of node indices."""
+        return float(np.sum(euclidean_distance(self.points[path[:-1]].T, self.points[path[1:]].T)))
+
+def benchmark_neighbor_graph(sizes=(10_000, 100_000, 1_000_000), k=8):
+    """Builds kNN graphs over random points and times A* against plain Dijkstra."""
+    rng = np.random.default_rng(0)
+    print(f"{'V':>9} {'edges':>10} {'graph MB':>9} {'build s':>8} {'A* s':>7} {'Dijkstra s':>10}")
+    for size in sizes:
+        points = rng.uniform(0, 1, (size, 2))
+        start_time = time.perf_counter()
+        graph = NeighborGraph.knn(points, k)
+        build_time = time.perf_counter() - start_time
+
+        # Corner to corner: the longest kind of query
+        start_idx = int(np.argmin(points.sum(axis=1)))
+        end_idx = int(np.argmax(points.sum(axis=1)))
+        start_time = time.perf_counter()
+        path = graph.astar(start_idx, end_idx)
+        astar_time = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        reference = graph.astar(start_idx, end_idx, use_heuristic=False)
+        dijkstra_time = time.perf_counter() - start_time
+
+        if (path is None) != (reference is None) or \
+                (path and not np.isclose(graph.path_length(path), graph.path_length(reference))):
+            print("  Warning: A* and Dijkstra disagree!")
+        print(f"{size:>9} {graph.num_edges:>10,} {graph.nbytes / 1e6:>9.1f} {build_time:>8.2f} "
+              f"{astar_time:>7.2f} {dijkstra_time:>10.2f}")
+
+# --- Part 2b: Offline frame rendering ---
+
+# Frames each worker renders per task when writing PNG files / feeding a video
+PNG_TASK_FRAMES = 256
+VIDEO_TASK_FRAMES = 16
+# Output names with these extensions are encoded as video; anything else is a directory
+VIDEO_EXTENSIONS = {".mp4", ".mkv", ".mov", ".avi", ".webm", ".gif"}
+
+def draw_path_scene(ax, full_path, animated=False):
+    """Draws the static part of the animation and returns the (empty) particle marker."""
+    ax.set_title("Reconstructed Particle Path (Animation)")
+    ax.set_xlabel("X Coordinate")
+    ax.set_ylabel("Y Coordinate")
+    ax.plot(full_path[:, 0], full_path[:, 1], 'g--', alpha=0.5, label='Interpolated Path')
+    particle, = ax.plot([], [], 'bo', markersize=10, label='Particle', animated=animated)
+    ax.legend()
+    ax.grid(True)
+    ax.set_xlim(np.min(full_path[:,0]) - 1, np.max(full_path[:,0]) + 1)
+    ax.set_ylim(np.min(full_path[:,1]) - 1, np.max(full_path[:,1]) + 1)
+    return particle
+
+class FrameRenderer:
+    """
+    Renders animation frames off-screen with the Agg canvas. The static
+    scene is drawn once and cached; every frame only restores that
+    background and draws the particle on top of it (blitting).
+    """
+
+    def __init__(self, full_path, figsize=(10, 8), dpi=50):
+        self.full_path = full_path
+        self.figure = Figure(figsize=figsize, dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.figure)
+        self.ax = self.figure.add_subplot()
+        self.particle = draw_path_scene(self.ax, full_path, animated=True)
+        self.canvas.draw()
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self.width, self.height = (int(v) for v in self.canvas.get_width_height())
+
+    def render(self, i):
+        """Draws frame i and returns the canvas's RGBA buffer (reused by the next frame)."""
+        self.canvas.restore_region(self.background)
+        self.particle.set_data([self.full_path[i, 0]], [self.full_path[i, 1]])
+        self.ax.draw_artist(self.particle)
+        return self.canvas.buffer_rgba()
+
+# Each worker process builds its renderer once and keeps it for all of its tasks
+_worker_renderer = None
+
+def _init_render_worker(full_path, figsize, dpi):
+    global _worker_renderer
+    _worker_renderer = FrameRenderer(full_path, figsize, dpi)
+
+def _render_frame_range(task):
+    """Worker: renders frames [start, stop) to PNG files, or returns them as raw RGBA bytes."""
+    start, stop, out_dir = task
+    if out_dir is None:
+        return b"".join(bytes(_worker_renderer.render(i)) for i in range(start, stop))
+    for i in range(start, stop):
+        image = Image.frombuffer("RGBA", (_worker_renderer.width, _worker_renderer.height),
+                                 _worker_renderer.render(i), "raw", "RGBA", 0, 1)
+        image.save(os.path.join(out_dir, f"frame_{i:06d}.png"), compress_level=1)
+    return stop - start
+
+def _peak_memory_mb():
+    """(Peak RSS of this process, of its largest finished child) in MB, or None if unknown."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is in kilobytes on Linux
+    return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1e3)
+
+def export_animation(full_path, out, workers=1, fps=30, figsize=(10, 8), dpi=50):
+    """
+    Renders one frame per path point without a display. out is either a
+    directory (one PNG per frame) or a video file with one of the
+    VIDEO_EXTENSIONS, which is encoded by an ffmpeg subprocess. With workers > 1 contiguous frame
+    ranges are rendered in a process pool; video frames are still fed to
+    ffmpeg in order, with only a few ranges in flight at a time.
+    Returns the number of frames rendered.
+    """
+    num_frames = len(full_path)
+    to_video = os.path.splitext(out)[1].lower() in VIDEO_EXTENSIONS
+    task_frames = VIDEO_TASK_FRAMES if to_video else PNG_TASK_FRAMES
+    tasks = [(lo, min(lo + task_frames, num_frames), None if to_video else out)
+             for lo in range(0, num_frames, task_frames)]
+
+    encoder = None
+    if to_video:
+        ffmpeg = shutil.which("ffmpeg")
+        if ffmpeg is None:
+            raise RuntimeError("ffmpeg was not found; export to a directory of PNG files instead")
+        probe = FrameRenderer(full_path, figsize, dpi)
+        encoder = subprocess.Popen(
+            [ffmpeg, "-y", "-loglevel", "error", "-f", "rawvideo", "-pix_fmt", "rgba",
+             "-s", f"{probe.width}x{probe.height}", "-r", str(fps), "-i", "-",
+             "-pix_fmt", "yuv420p", out], stdin=subprocess.PIPE)
+    else:
+        os.makedirs(out, exist_ok=True)
+
+    def consume(result):
+        if encoder is not None:
+            try:
+                encoder.stdin.write(result)
+            except BrokenPipeError:
+                raise RuntimeError(f"ffmpeg exited with status {encoder.wait()} "
+                                   f"while encoding {out}") from None
+
+    try:
+        if workers > 1:
+            with Pool(workers, initializer=_init_render_worker,
+                      initargs=(full_path, figsize, dpi)) as pool:
+                # A sliding window of pending tasks keeps memory bounded and output in order
+                pending = deque()
+                for task in tasks:
+                    pending.append(pool.apply_async(_render_frame_range, (task,)))
+                    if len(pending) >= 2 * workers:
+                        consume(pending.popleft().get())
+                while pending:
+                    consume(pending.popleft().get())
+        else:
+            _init_render_worker(full_path, figsize, dpi)
+            for task in tasks:
+                consume(_render_frame_range(task))
+    finally:
+        if encoder is not None:
+            try:
+                encoder.stdin.close()
+            except BrokenPipeError:
+                pass # ffmpeg is gone; its exit status says why
+            status = encoder.wait()
+    if encoder is not None and status != 0:
+        raise RuntimeError(f"ffmpeg exited with status {status} while encoding {out}")
+    return num_frames
+
+def resample_path(full_path, num_frames):
+    """Evenly resamples a path to num_frames points (for long test animations)."""
+    positions = np.linspace(0, len(full_path) - 1, num_frames)
+    indices = np.arange(len(full_path))
+    return np.column_stack([np.interp(positions, indices, full_path[:, d])
+                            for d in range(full_path.shape[1])])
+
 # --- Main Execution ---
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--bench":
+        benchmark_dijkstra()
+        sys.exit()
+    if len(sys.argv) > 1 and sys.argv[1] == "--bench-knn":
+        benchmark_neighbor_graph()
+        sys.exit()
+
     incomplete_path_data = [
         (0, 1), (1, 3), (2, 5), (3, 6), (4, None), 
         (5, 7), (6, 8), (7, None), (8, 10), (9, 11), 
@@ -91,21 +528,32 @@ if __name__ == "__main__":
     # Perform Part 1
     full_path = reconstruct_path(incomplete_path_data)
     print("Path reconstructed successfully.")
+
+    # Usage: python sol3.py --export OUT_DIR_OR_VIDEO [--frames N] [--workers N]
+    if len(sys.argv) > 2 and sys.argv[1] == "--export":
+        options = dict(zip(sys.argv[3::2], sys.argv[4::2]))
+        num_frames = int(options.get("--frames", len(full_path)))
+        frames_path = resample_path(full_path, num_frames) if num_frames != len(full_path) else full_path
+
+        start = time.perf_counter()
+        try:
+            export_animation(frames_path, sys.argv[2], workers=int(options.get("--workers", 1)))
+        except RuntimeError as e:
+            sys.exit(f"Error: {e}")
+        elapsed = time.perf_counter() - start
+        print(f"Rendered {num_frames} frames to {sys.argv[2]} in {elapsed:.2f} s "
+              f"({num_frames / elapsed:.1f} frames/s)")
+        peak = _peak_memory_mb()
+        if peak is not None:
+            print(f"Peak memory: {peak[0]:.0f} MB (main process), {peak[1]:.0f} MB (largest child process)")
+        sys.exit()
     
     # --- Part 2: Visualization and Simulation ---
     fig, ax = plt.subplots(figsize=(10, 8))
-    ax.set_title("Reconstructed Particle Path (Animation)")
-    ax.set_xlabel("X Coordinate")
-    ax.set_ylabel("Y Coordinate")
-    ax.plot(full_path[:, 0], full_path[:, 1], 'g--', alpha=0.5, label='Interpolated Path')
-    particle, = ax.plot([], [], 'bo', markersize=10, label='Particle')
-    ax.legend()
-    ax.grid(True)
-    ax.set_xlim(np.min(full_path[:,0]) - 1, np.max(full_path[:,0]) + 1)
-    ax.set_ylim(np.min(full_path[:,1]) - 1, np.max(full_path[:,1]) + 1)
+    particle = draw_path_scene(ax, full_path)
 
     def animate(i):
-        particle.set_data(full_path[i, 0], full_path[i, 1])
+        particle.set_data([full_path[i, 0]], [full_path[i, 1]])
         return particle,
     
     # Note: Animation might not display in all environments. A static plot is always shown.
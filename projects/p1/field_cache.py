@@ -0,0 +1,190 @@
+# Persistent cache of field grids for fields_Sim.py (NumPy only)
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+
+from field_engine import charge_arrays, electric_field, electric_potential, grid_points
+
+# Where cached grids are kept, and how much disk space they may use in total
+CACHE_DIR = ".field_cache"
+MAX_CACHE_BYTES = 512 * 1024 * 1024
+
+# Observation points computed and written per step, so memory stays bounded
+TILE_POINTS = 65536
+
+def _canonical_charges(q, positions):
+    """(N, 4) rows of (q, x, y, z) in a fixed order, so the charge list order doesn't matter."""
+    rows = np.column_stack((np.asarray(q, dtype=float),
+                            np.asarray(positions, dtype=float).reshape(-1, 3)))
+    return rows[np.lexsort(rows.T[::-1])] if len(rows) else rows.reshape(0, 4)
+
+def cache_key(q, positions, grid_range, grid_step):
+    """Hash of the charge configuration and the grid it is evaluated on."""
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(_canonical_charges(q, positions)).tobytes())
+    digest.update(repr((float(grid_range), float(grid_step))).encode())
+    return digest.hexdigest()[:32]
+
+class FieldGridCache:
+    """
+    Stores the field (M, 3) and potential (M,) of a charge configuration on
+    the visualize_3d_field grid as .npy files, read back memory-mapped. Each
+    entry is <key>.field.npy + <key>.potential.npy + <key>.json (written
+    last, so an entry without it is incomplete and ignored).
+
+    When a configuration is not cached, the closest cached one on the same
+    grid is reused if that is cheaper: only the contributions of removed and
+    added charges (a changed charge is both) are subtracted and added. Old
+    entries are evicted, least recently used first, once the files take up
+    more than max_bytes.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = self.misses = self.incremental = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key, suffix):
+        return os.path.join(self.directory, key + suffix)
+
+    def _entry_files(self, key):
+        return [self._path(key, suffix) for suffix in (".field.npy", ".potential.npy", ".json")]
+
+    def _load(self, key):
+        """Opens a cached entry memory-mapped and marks it as recently used."""
+        os.utime(self._path(key, ".json")) # the metadata mtime is the LRU clock
+        return (np.load(self._path(key, ".field.npy"), mmap_mode='r'),
+                np.load(self._path(key, ".potential.npy"), mmap_mode='r'))
+
+    def _metadata(self):
+        """Yields (key, metadata) for every complete entry."""
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                try:
+                    with open(os.path.join(self.directory, name), 'r') as f:
+                        yield name[:-len(".json")], json.load(f)
+                except (OSError, ValueError):
+                    continue # Half-written or being evicted
+
+    def get(self, q, positions, grid_range, grid_step):
+        """Returns (field, potential) for the grid, computing and caching it if needed."""
+        key = cache_key(q, positions, grid_range, grid_step)
+        if os.path.exists(self._path(key, ".json")):
+            self.hits += 1
+            return self._load(key)
+
+        self.misses += 1
+        charges = _canonical_charges(q, positions)
+        points = grid_points(grid_range, grid_step)
+        base = self._closest_entry(charges, grid_range, grid_step)
+        self._store(key, charges, points, grid_range, grid_step, base)
+        self._evict(keep=key)
+        return self._load(key)
+
+    def get_for_charges(self, charges, grid_range, grid_step):
+        """get() for a list of Charge objects."""
+        return self.get(*charge_arrays(charges), grid_range, grid_step)
+
+    def _closest_entry(self, charges, grid_range, grid_step):
+        """
+        Finds the cached entry on the same grid that needs the fewest charge
+        updates. Returns (key, removed, added) or None if a full computation
+        is cheaper.
+        """
+        wanted = Counter(map(tuple, charges.tolist()))
+        best = None
+        for key, meta in self._metadata():
+            if meta["grid_range"] != float(grid_range) or meta["grid_step"] != float(grid_step):
+                continue
+            cached = Counter(map(tuple, meta["charges"]))
+            removed, added = cached - wanted, wanted - cached
+            cost = sum(removed.values()) + sum(added.values())
+            if cost < len(charges) and (best is None or cost < best[0]):
+                best = (cost, key, removed, added)
+        if best is None:
+            return None
+        _, key, removed, added = best
+        return key, list(removed.elements()), list(added.elements())
+
+    def _store(self, key, charges, points, grid_range, grid_step, base):
+        """Writes a new entry, either from scratch or by updating the base entry."""
+        q, positions = charges[:, 0], charges[:, 1:]
+        if base is not None:
+            base_key, removed, added = base
+            base_field, base_potential = self._load(base_key)
+            # Removed charges enter with the opposite sign
+            delta = np.array(removed + added, dtype=float).reshape(-1, 4)
+            delta_q = np.r_[-delta[:len(removed), 0], delta[len(removed):, 0]]
+            q, positions = delta_q, delta[:, 1:]
+            self.incremental += 1
+
+        tmp_field = self._path(key, ".field.tmp")
+        tmp_potential = self._path(key, ".potential.tmp")
+        field = np.lib.format.open_memmap(tmp_field, mode='w+', dtype=np.float64, shape=(len(points), 3))
+        potential = np.lib.format.open_memmap(tmp_potential, mode='w+', dtype=np.float64,
+                                              shape=(len(points),))
+        for lo in range(0, len(points), TILE_POINTS):
+            tile = points[lo:lo + TILE_POINTS]
+            field[lo:lo + TILE_POINTS] = electric_field(q, positions, tile)
+            potential[lo:lo + TILE_POINTS] = electric_potential(q, positions, tile)
+            if base is not None:
+                field[lo:lo + TILE_POINTS] += base_field[lo:lo + TILE_POINTS]
+                potential[lo:lo + TILE_POINTS] += base_potential[lo:lo + TILE_POINTS]
+        field.flush()
+        potential.flush()
+        del field, potential
+
+        os.replace(tmp_field, self._path(key, ".field.npy"))
+        os.replace(tmp_potential, self._path(key, ".potential.npy"))
+        meta = {"grid_range": float(grid_range), "grid_step": float(grid_step),
+                "charges": charges.tolist(), "base": base[0] if base else None}
+        tmp_meta = self._path(key, ".json.tmp")
+        with open(tmp_meta, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_meta, self._path(key, ".json"))
+
+    def _evict(self, keep=None):
+        """Deletes least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        total = 0
+        for key, _ in self._metadata():
+            files = [path for path in self._entry_files(key) if os.path.exists(path)]
+            size = sum(os.path.getsize(path) for path in files)
+            entries.append((os.path.getmtime(self._path(key, ".json")), key, size))
+            total += size
+
+        for _, key, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            # Metadata first, so a half-deleted entry is never taken as complete
+            for path in reversed(self._entry_files(key)):
+                if os.path.exists(path):
+                    os.remove(path)
+            total -= size
+
+if __name__ == "__main__":
+    # Usage: python field_cache.py --demo   -> full, cached and incremental timings
+    if len(sys.argv) > 1 and sys.argv[1] == "--demo":
+        rng = np.random.default_rng(0)
+        q = rng.normal(0, 1e-6, 200)
+        positions = rng.uniform(-5, 5, (200, 3))
+        cache = FieldGridCache(os.path.join(CACHE_DIR, "demo"))
+
+        for label, (charges_q, charges_pos) in [
+                ("first run", (q, positions)),
+                ("same charges", (q, positions)),
+                ("one charge moved", (q, np.vstack((positions[:-1], [[0.5, 0.5, 0.5]])))),
+                ("one charge added", (np.r_[q, 1e-6], np.vstack((positions, [[1, 2, 3]]))))]:
+            start = time.perf_counter()
+            field, potential = cache.get(charges_q, charges_pos, 5, 0.25)
+            print(f"{label:>16}: {time.perf_counter() - start:.3f} s "
+                  f"({len(field):,} points; hits={cache.hits}, misses={cache.misses}, "
+                  f"incremental={cache.incremental})")
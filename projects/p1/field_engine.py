@@ -0,0 +1,339 @@
+# Pure NumPy field calculations for fields_Sim.py (no VPython needed)
+import sys
+import time
+
+import numpy as np
+
+# --- Physical Constants ---
+K_e = 8.99e9  # Coulomb's constant (N m^2 / C^2)
+
+# Charges closer than this to an observation point are skipped, as in fields_Sim.py
+MIN_DISTANCE = 1e-6
+
+# Upper bound for the temporary (points x charges x 3) arrays of one tile
+TILE_BYTES = 64 * 1024 * 1024
+
+# --- Conversions from the VPython-based objects ---
+
+def as_xyz(pos):
+    """Returns (x, y, z) for a vpython.vector or any 3-element sequence."""
+    if hasattr(pos, "x"):
+        return (pos.x, pos.y, pos.z)
+    return tuple(pos)
+
+def charge_arrays(charges):
+    """
+    Turns a list of Charge objects (anything with .q and .pos) into a
+    (N,) array of charges and a (N, 3) array of positions.
+    """
+    q = np.array([charge.q for charge in charges], dtype=float)
+    positions = np.array([as_xyz(charge.pos) for charge in charges], dtype=float).reshape(-1, 3)
+    return q, positions
+
+# --- Field calculation ---
+
+def _tile_rows(num_charges, tile_bytes):
+    """How many observation points fit in one tile next to num_charges charges."""
+    # r_vec, r_hat and the contributions are the three big temporaries
+    per_point = max(1, num_charges) * 3 * 8 * 3
+    return max(1, tile_bytes // per_point)
+
+def electric_field(q, positions, points, tile_bytes=TILE_BYTES):
+    """
+    Net electric field of charges q at positions (N, 3) for every
+    observation point in points (M, 3), returned as an (M, 3) array.
+
+    All charge-point pairs of a tile are computed at once by broadcasting,
+    with the same formula as calculate_net_efield: (K_e q / r^2) * r_hat,
+    skipping charges closer than MIN_DISTANCE. Tiles of observation points
+    keep the temporary arrays below tile_bytes.
+    """
+    q = np.asarray(q, dtype=float)
+    positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+    points = np.asarray(points, dtype=float).reshape(-1, 3)
+    field = np.zeros_like(points)
+    if len(q) == 0:
+        return field
+
+    rows = _tile_rows(len(q), tile_bytes)
+    for lo in range(0, len(points), rows):
+        r_vec = points[lo:lo + rows, None, :] - positions[None, :, :]
+        r_mag = np.sqrt(np.sum(r_vec * r_vec, axis=2))
+        skip = r_mag < MIN_DISTANCE
+        # Skipped pairs may divide by zero; their contribution is replaced by 0 below
+        with np.errstate(divide='ignore', invalid='ignore'):
+            r_hat = r_vec / r_mag[:, :, None]
+            contributions = (K_e * q / r_mag**2)[:, :, None] * r_hat
+        contributions[skip] = 0.0
+        field[lo:lo + rows] = contributions.sum(axis=1)
+    return field
+
+def electric_potential(q, positions, points, tile_bytes=TILE_BYTES):
+    """
+    Net electric potential K_e q / r of the charges at every observation
+    point, as an (M,) array, tiled like electric_field and with the same
+    MIN_DISTANCE skip.
+    """
+    q = np.asarray(q, dtype=float)
+    positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+    points = np.asarray(points, dtype=float).reshape(-1, 3)
+    potential = np.zeros(len(points))
+    if len(q) == 0:
+        return potential
+
+    rows = _tile_rows(len(q), tile_bytes)
+    for lo in range(0, len(points), rows):
+        r_vec = points[lo:lo + rows, None, :] - positions[None, :, :]
+        r_mag = np.sqrt(np.sum(r_vec * r_vec, axis=2))
+        with np.errstate(divide='ignore'):
+            contributions = K_e * q / r_mag
+        contributions[r_mag < MIN_DISTANCE] = 0.0
+        potential[lo:lo + rows] = contributions.sum(axis=1)
+    return potential
+
+def field_magnitude(field):
+    """Length of every field vector in an (M, 3) array."""
+    return np.sqrt(np.sum(field * field, axis=1))
+
+def grid_points(grid_range, grid_step):
+    """
+    The observation grid of visualize_3d_field as an (M, 3) array, in the
+    same order as its nested x, y, z loops.
+    """
+    axis = np.arange(-grid_range, grid_range + grid_step, grid_step)
+    x, y, z = np.meshgrid(axis, axis, axis, indexing='ij')
+    return np.column_stack((x.ravel(), y.ravel(), z.ravel()))
+
+# --- Barnes-Hut tree code for many charges ---
+
+def _morton_codes(cells, depth):
+    """Interleaves the bits of integer (x, y, z) cell coordinates into one octree key each."""
+    codes = np.zeros(len(cells), dtype=np.int64)
+    for bit in range(depth):
+        for axis in range(3):
+            codes |= ((cells[:, axis] >> bit) & 1) << (3 * bit + 2 - axis)
+    return codes
+
+def _expand_ranges(owners, starts, counts):
+    """For pairs (owner, [start, start + count)), lists every (owner, index) pair."""
+    total = int(counts.sum())
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    return np.repeat(owners, counts), np.repeat(starts, counts) + offsets
+
+class _Level:
+    """All octree nodes at one depth, as parallel arrays (sorted by Morton key)."""
+
+    def __init__(self, prefix, start, end, center, offset, size, charge, dipole, quadrupole, is_leaf):
+        self.prefix = prefix
+        self.start, self.end = start, end  # charges of node i are sorted[start[i]:end[i]]
+        self.center = center               # expansion center
+        self.offset = offset               # distance from the expansion center to the cell center
+        self.size = size                   # edge length of every cell at this depth
+        self.charge = charge               # total charge (monopole)
+        self.dipole = dipole               # dipole moment about the expansion center
+        self.quadrupole = quadrupole       # traceless quadrupole tensor about it
+        self.is_leaf = is_leaf
+        self.child_lo = self.child_hi = None
+
+class BarnesHutTree:
+    """
+    An octree over point charges for approximate fields in O(M log N).
+    A cell that looks small from the observation point (cell size <
+    theta * distance) is replaced by its monopole, dipole and quadrupole
+    moments about its |q|-weighted center; nearer cells are opened, down to
+    leaves of at most leaf_size charges, which are summed directly like
+    electric_field. Smaller theta is more accurate and slower; theta
+    must be below 1 so a cell is never approximated from a point inside it.
+    """
+
+    def __init__(self, q, positions, leaf_size=16, max_depth=21):
+        q = np.asarray(q, dtype=float)
+        positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+        self.num_charges = len(q)
+
+        # Cube around all charges, cut into 2**max_depth cells per axis
+        low = positions.min(axis=0) if len(q) else np.zeros(3)
+        extent = float((positions.max(axis=0) - low).max()) if len(q) else 0.0
+        extent = extent * (1 + 1e-9) or 1.0
+        cells = np.clip(((positions - low) / extent * (1 << max_depth)).astype(np.int64),
+                        0, (1 << max_depth) - 1)
+        codes = _morton_codes(cells, max_depth)
+        order = np.argsort(codes, kind='stable')
+        codes, cells = codes[order], cells[order]
+        self.q, self.positions = q[order], positions[order]
+
+        self.levels = []
+        weighted = self.q[:, None] * self.positions
+        second = weighted[:, :, None] * self.positions[:, None, :] # q x x^T per charge
+        abs_q = np.abs(self.q)
+        abs_weighted = abs_q[:, None] * self.positions
+        for depth in range(max_depth + 1):
+            prefix = codes >> (3 * (max_depth - depth))
+            if len(q):
+                start = np.flatnonzero(np.r_[True, prefix[1:] != prefix[:-1]])
+            else:
+                start = np.zeros(0, dtype=np.intp)
+            end = np.r_[start[1:], len(q)].astype(np.intp)
+            size = extent / (1 << depth)
+            cell_center = low + ((cells[start] >> (max_depth - depth)) + 0.5) * size
+            if len(q):
+                charge = np.add.reduceat(self.q, start)
+                first_moment = np.add.reduceat(weighted, start, axis=0)
+                second_moment = np.add.reduceat(second, start, axis=0)
+                strength = np.add.reduceat(abs_q, start)
+                abs_moment = np.add.reduceat(abs_weighted, start, axis=0)
+            else:
+                charge = strength = np.zeros(0)
+                first_moment = abs_moment = np.zeros((0, 3))
+                second_moment = np.zeros((0, 3, 3))
+            # Expand about the |q|-weighted center: for same-sign cells the dipole
+            # term then vanishes, and mixed cells keep a small one
+            with np.errstate(divide='ignore', invalid='ignore'):
+                center = np.where(strength[:, None] > 0, abs_moment / strength[:, None], cell_center)
+            offset = np.sqrt(np.sum((center - cell_center)**2, axis=1))
+            dipole = first_moment - charge[:, None] * center
+            # Traceless quadrupole sum(q (3 d d^T - |d|^2 I)) with d = x - center
+            spread = (second_moment - first_moment[:, :, None] * center[:, None, :]
+                      - center[:, :, None] * first_moment[:, None, :]
+                      + charge[:, None, None] * center[:, :, None] * center[:, None, :])
+            quadrupole = 3 * spread - np.trace(spread, axis1=1, axis2=2)[:, None, None] * np.eye(3)
+            level = _Level(prefix[start], start, end, center, offset, size, charge, dipole,
+                           quadrupole, (end - start <= leaf_size) | (depth == max_depth))
+            if self.levels:
+                parent = self.levels[-1]
+                parent.child_lo = np.searchsorted(level.prefix >> 3, parent.prefix, 'left')
+                parent.child_hi = np.searchsorted(level.prefix >> 3, parent.prefix, 'right')
+            self.levels.append(level)
+            if level.is_leaf.all():
+                break
+
+    @classmethod
+    def from_charges(cls, charges, **kwargs):
+        """Builds the tree from Charge objects (their .q and .pos)."""
+        return cls(*charge_arrays(charges), **kwargs)
+
+    def field(self, points, theta=0.5, tile_points=4096):
+        """Approximate net electric field at every point of points (M, 3)."""
+        if not 0 < theta < 1:
+            raise ValueError("theta must be between 0 and 1")
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        field = np.zeros_like(points)
+        if self.num_charges == 0:
+            return field
+        for lo in range(0, len(points), tile_points):
+            field[lo:lo + tile_points] = self._tile_field(points[lo:lo + tile_points], theta)
+        return field
+
+    def _tile_field(self, points, theta):
+        """Walks the tree one depth at a time for all (point, node) pairs of a tile."""
+        num_points = len(points)
+        field = np.zeros((num_points, 3))
+        targets = np.arange(num_points)
+        nodes = np.zeros(num_points, dtype=np.intp) # everyone starts at the root
+
+        for level in self.levels:
+            if not len(targets):
+                break
+            r_vec = points[targets] - level.center[nodes]
+            r_mag = np.sqrt(np.sum(r_vec * r_vec, axis=1))
+            # Measuring from the far side of the center's offset keeps points inside a cell out
+            accept = level.size < theta * (r_mag - level.offset[nodes])
+
+            # Far cells: monopole + dipole + quadrupole field about the expansion center
+            t, n, r, d = targets[accept], nodes[accept], r_vec[accept], r_mag[accept]
+            p = level.dipole[n]
+            quad_r = np.einsum('nij,nj->ni', level.quadrupole[n], r)
+            inv_d2 = 1.0 / d**2
+            inv_d3 = inv_d2 / d
+            p_dot_r = np.sum(p * r, axis=1)
+            r_quad_r = np.sum(r * quad_r, axis=1)
+            contributions = K_e * (
+                ((level.charge[n] + 3 * p_dot_r * inv_d2 + 2.5 * r_quad_r * inv_d2**2) * inv_d3)[:, None] * r
+                - inv_d3[:, None] * p
+                - (inv_d3 * inv_d2)[:, None] * quad_r)
+            for axis in range(3):
+                field[:, axis] += np.bincount(t, contributions[:, axis], minlength=num_points)
+
+            # Near leaves: direct sum over their charges
+            near = ~accept
+            leaf = near & level.is_leaf[nodes]
+            t, charge_idx = _expand_ranges(targets[leaf], level.start[nodes[leaf]],
+                                           level.end[nodes[leaf]] - level.start[nodes[leaf]])
+            r = points[t] - self.positions[charge_idx]
+            d = np.sqrt(np.sum(r * r, axis=1))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                contributions = (K_e * self.q[charge_idx] / d**2)[:, None] * (r / d[:, None])
+            contributions[d < MIN_DISTANCE] = 0.0
+            for axis in range(3):
+                field[:, axis] += np.bincount(t, contributions[:, axis], minlength=num_points)
+
+            # Everything else: continue with the children at the next depth
+            opened = near & ~leaf
+            if level.child_lo is None or not opened.any():
+                break
+            n = nodes[opened]
+            targets, nodes = _expand_ranges(targets[opened], level.child_lo[n],
+                                            level.child_hi[n] - level.child_lo[n])
+        return field
+
+def field_error_report(q, positions, points, theta=0.5, tree=None):
+    """
+    Compares the tree code with the direct sum at the given points and
+    returns a dict with timings and the max / RMS relative error, where
+    the error of each point is |E_tree - E_direct| / |E_direct|.
+    """
+    start = time.perf_counter()
+    exact = electric_field(q, positions, points)
+    direct_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if tree is None:
+        tree = BarnesHutTree(q, positions)
+    build_time = time.perf_counter() - start
+    start = time.perf_counter()
+    approx = tree.field(points, theta)
+    tree_time = time.perf_counter() - start
+
+    magnitude = field_magnitude(exact)
+    valid = magnitude > 0
+    errors = field_magnitude(approx - exact)[valid] / magnitude[valid]
+    return {
+        "direct_s": direct_time, "build_s": build_time, "tree_s": tree_time,
+        "max_rel_error": float(errors.max()) if len(errors) else 0.0,
+        "rms_rel_error": float(np.sqrt(np.mean(errors**2))) if len(errors) else 0.0,
+    }
+
+def benchmark_tree(sizes=(100, 300, 1000, 3000, 10_000, 30_000, 100_000), num_points=2048,
+                   thetas=(0.3, 0.5, 0.7)):
+    """
+    Times direct summation against the tree code (build + evaluation) for
+    growing numbers of charges, and reports where the tree code starts to win.
+    """
+    rng = np.random.default_rng(0)
+    points = rng.uniform(-1, 1, (num_points, 3))
+    print(f"{num_points} observation points")
+    print(f"{'charges':>8} {'theta':>5} {'direct s':>9} {'tree s':>8} {'speedup':>8} "
+          f"{'max err':>9} {'rms err':>9}")
+    crossover = {}
+    for num_charges in sizes:
+        q = rng.normal(0, 1e-6, num_charges)
+        positions = rng.uniform(-1, 1, (num_charges, 3))
+        tree_start = time.perf_counter()
+        tree = BarnesHutTree(q, positions)
+        build_time = time.perf_counter() - tree_start
+        for theta in thetas:
+            report = field_error_report(q, positions, points, theta, tree)
+            tree_time = build_time + report["tree_s"]
+            speedup = report["direct_s"] / tree_time
+            if speedup > 1 and theta not in crossover:
+                crossover[theta] = num_charges
+            print(f"{num_charges:>8} {theta:>5} {report['direct_s']:>9.3f} {tree_time:>8.3f} "
+                  f"{speedup:>8.2f} {report['max_rel_error']:>9.2e} {report['rms_rel_error']:>9.2e}")
+    for theta in thetas:
+        where = f"from about {crossover[theta]:,} charges" if theta in crossover else "not reached"
+        print(f"theta={theta}: tree code faster {where}")
+
+if __name__ == "__main__":
+    # Usage: python field_engine.py --bench   -> direct vs Barnes-Hut benchmark
+    if len(sys.argv) > 1 and sys.argv[1] == "--bench":
+        benchmark_tree()
@@ -3,8 +3,9 @@ import vpython as vp
 import numpy as np
 import matplotlib.pyplot as plt
 
-# --- Physical Constants ---
-K_e = 8.99e9  # Coulomb's constant (N m^2 / C^2)
+# The field math lives in field_engine.py, which only needs NumPy
+from field_engine import K_e, as_xyz, charge_arrays, electric_field, field_magnitude, grid_points
+from field_cache import FieldGridCache
 
 # --- Object-Oriented Structure for Charges ---
 
@@ -43,20 +44,10 @@ def calculate_net_efield(charges, obs_pos):
     Calculates the net electric field at a given observation position
     due to a list of charges, using the superposition principle.
     """
-    E_net = vp.vector(0, 0, 0)
-    for charge in charges:
-        r_vec = obs_pos - charge.pos
-        r_mag = vp.mag(r_vec)
-        
-        # Avoid division by zero if the observation point is on a charge
-        if r_mag < 1e-6:
-            continue
-            
-        r_hat = vp.norm(r_vec)
-        E_field = (K_e * charge.q / r_mag**2) * r_hat
-        E_net += E_field
-        
-    return E_net
+    # Observation points on a charge (closer than 1e-6) skip that charge
+    q, positions = charge_arrays(charges)
+    E_net = electric_field(q, positions, [as_xyz(obs_pos)])[0]
+    return vp.vector(*E_net)
 
 # --- Main Simulation and Visualization Functions ---
 
@@ -71,20 +62,21 @@ def visualize_3d_field(charge_objects):
     # 2. Define a grid of points to visualize the field
     grid_range = 5
     grid_step = 1.0
-    points = [vp.vector(x, y, z) 
-              for x in np.arange(-grid_range, grid_range + grid_step, grid_step)
-              for y in np.arange(-grid_range, grid_range + grid_step, grid_step)
-              for z in np.arange(-grid_range, grid_range + grid_step, grid_step)]
+    points = grid_points(grid_range, grid_step)
     
     # 3. Calculate and draw the E-field vectors (arrows)
     # A scaling factor is needed to make the arrows visible but not too large
     E_scale = 0.5 / (K_e * 1e-6 / grid_step**2) 
 
-    for point in points:
-        E_vector = calculate_net_efield(charge_objects, point)
-        E_magnitude = vp.mag(E_vector)
-        
+    # The grid is computed in one vectorized pass, or loaded from the on-disk
+    # cache if these charges (or nearly these charges) were simulated before
+    E_field, _ = FieldGridCache().get_for_charges(charge_objects, grid_range, grid_step)
+    E_magnitudes = field_magnitude(E_field)
+
+    for point, E_vector, E_magnitude in zip(points, E_field, E_magnitudes):
         if E_magnitude > 0:
+            point = vp.vector(*point)
+            E_vector = vp.vector(*E_vector)
             # Map magnitude to color (blue for weak, red for strong)
             arrow_color = vp.vector(min(1, E_magnitude/1e7), 0, max(0.5, 1 - E_magnitude/1e7))
             
@@ -101,13 +93,11 @@ def plot_field_vs_distance(charge_objects):
     
     # Generate a range of distances
     distances = np.linspace(ref_charge.radius * 2, 10, 200)
-    E_magnitudes = []
     
-    for r in distances:
-        # Calculate E-field at a point 'r' distance away along the x-axis
-        obs_point = ref_charge.pos + vp.vector(r, 0, 0)
-        E_net = calculate_net_efield(charge_objects, obs_point)
-        E_magnitudes.append(vp.mag(E_net))
+    # Calculate E-field at points 'r' distance away along the x-axis, all at once
+    obs_points = np.array(as_xyz(ref_charge.pos)) + np.outer(distances, [1, 0, 0])
+    q, positions = charge_arrays(charge_objects)
+    E_magnitudes = field_magnitude(electric_field(q, positions, obs_points))
         
     # Create the plot using Matplotlib
     plt.figure(figsize=(10, 6))